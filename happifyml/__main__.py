@@ -5,7 +5,8 @@ import platform
 import sys
 
 from happifyml import __version__
-from happifyml.cli import cloud, deployment, project
+from happifyml.cli import cloud, data, deployment, models, project
+from happifyml.utils import call_stats
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +22,9 @@ def get_parser() -> argparse.ArgumentParser:
     parser.add_argument(
         "-V", "--version", action="store_true", default=argparse.SUPPRESS, help="Print installed HappifyML version"
     )
+    parser.add_argument(
+        "--debug", action="store_true", help="Print debug logs, including retries and latencies of remote calls"
+    )
 
     main_parser = argparse.ArgumentParser(add_help=False)
 
@@ -28,6 +32,8 @@ def get_parser() -> argparse.ArgumentParser:
 
     project.register(subparsers, parents=[main_parser])
     cloud.register(subparsers, parents=[main_parser])
+    data.register(subparsers, parents=[main_parser])
+    models.register(subparsers, parents=[main_parser])
     deployment.register(subparsers, parents=[main_parser])
 
     return parser
@@ -40,10 +46,21 @@ def print_version() -> None:
     print(f"Interpreter Path  : {sys.executable}")
 
 
+def log_call_stats() -> None:
+    for operation, stats in sorted(call_stats.summary().items()):
+        counters = " ".join(
+            f"{name}={value:.1f}" if isinstance(value, float) else f"{name}={value}" for name, value in stats.items()
+        )
+        logger.debug(f"{operation}: {counters}")
+
+
 def main():
     arg_parser = get_parser()
     cmd = arg_parser.parse_args()
 
+    if cmd.debug:
+        logging.basicConfig(level=logging.DEBUG, format="%(levelname)s %(name)s: %(message)s")
+
     sys.path.insert(1, os.getcwd())
 
     try:
@@ -63,6 +80,10 @@ def main():
         print(f"{e.__class__.__name__}: {e}")
         sys.exit(1)
 
+    finally:
+        # remote call counters (retries, hedges, timeouts) and p50/p99 latencies of the command
+        log_call_stats()
+
 
 if __name__ == "__main__":
     main()
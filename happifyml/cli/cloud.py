@@ -1,6 +1,5 @@
 import os
-import sys
-from argparse import ArgumentDefaultsHelpFormatter, ArgumentParser, Namespace
+from argparse import SUPPRESS, ArgumentDefaultsHelpFormatter, ArgumentParser, Namespace, _SubParsersAction
 from pathlib import Path
 from typing import List
 
@@ -8,7 +7,9 @@ import questionary
 from happifyml.utils import print_error_exit, print_success, print_success_exit
 
 # from ..integrations import azure
+from ..data import parse_data_spec
 from ..integrations import AzureML
+from ..integrations.export import EXPORT_FORMATS
 from ..utils import AzureCredentials, HfCredentials, WandbCredentials
 from . import SubParserAction
 
@@ -16,8 +17,65 @@ file_suffix = (".py", ".sh")
 current_dir = Path(os.getcwd()).name
 
 
+class _SubmitByDefault(_SubParsersAction):
+    """
+    Sub-commands of `hml azure`, anything else is a training command:
+    `hml azure python train.py` is short for `hml azure submit python train.py`.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # training commands aren't sub-command names, so argparse mustn't check them against the choices
+        self.choices = None
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        if values[0] not in self._name_parser_map:
+            values = ["submit", *values]
+        super().__call__(parser, namespace, values, option_string)
+
+
+def add_training_arguments(parser: ArgumentParser, suppress_defaults: bool = False) -> None:
+    """
+    Training job options. `hml azure` takes them before and after the training command, the ones after it are
+    parsed by the `submit` sub-command, without defaults so they don't override the ones given before.
+    """
+
+    def default(value):
+        return SUPPRESS if suppress_defaults else value
+
+    parser.add_argument(
+        "--relogin", action="store_true", default=default(False), help="relogin to Azure with different workspace"
+    )
+    parser.add_argument("--experiment", type=str, default=default(current_dir), help="experiment name")
+    parser.add_argument(
+        "--base-docker",
+        type=str,
+        default=default("mcr.microsoft.com/azureml/openmpi4.1.0-cuda11.1-cudnn8-ubuntu18.04"),
+        help="base docker image",
+    )
+    parser.add_argument("--nodes", type=int, default=default(None), help="number of nodes")
+    parser.add_argument("--compute-name", type=str, default=default(False), help="compute target name")
+
+
 def register(subparsers: SubParserAction, parents: List[ArgumentParser]) -> None:
+    """
+    Examples:
+    1. submit a training command, quote it when it has options of its own
+    `hml azure "python train.py --output-dir ckpt"`
+
+    2. register the best runs of a sweep
+    `hml azure register --experiment <sweep> --metric val_acc --top 5 --model-name <name> --model-path outputs/model`
+
+    3. export registered models
+    `hml azure export <model-name[:version]> --format onnx --quantize`
 
+    4. pull run outputs
+    `hml azure pull <run-id> --include "eval/*.json"`
+
+    5. job lifecycle trace
+    `hml azure timeline <run-id> --trace-file timeline.json`
+
+    """
     # Azure cloud parsers
     azure_parser = subparsers.add_parser(
         "azure",
@@ -33,44 +91,99 @@ def register(subparsers: SubParserAction, parents: List[ArgumentParser]) -> None
         help="submit argument to AWS cloud compute",
         formatter_class=ArgumentDefaultsHelpFormatter,
     )
+    aws_parser.add_argument("training_command", nargs="*", help="training commands you will use on local machine.")
+    add_training_arguments(aws_parser)
+    aws_parser.set_defaults(func=run_aws)
 
-    parsers = [azure_parser, aws_parser]
+    add_training_arguments(azure_parser)
+    azure_parser.add_argument(
+        "--data",
+        type=str,
+        action="append",
+        default=[],
+        help="dataset pushed with `hml data push` as name:version[:mount|download], can be repeated",
+    )
+    azure_parser.set_defaults(func=run_azure, training_command=[])
 
-    for parser in parsers:
-        parser.add_argument("training_command", nargs="*", help="training commands you will use on local machine.")
-        parser.add_argument("--relogin", action="store_true", help="relogin to Azure with different workspace")
+    commands = azure_parser.add_subparsers(action=_SubmitByDefault, metavar="command")
 
-        # training arguments
-        parser.add_argument("--experiment", type=str, default=current_dir, help="experiment name")
-        parser.add_argument(
-            "--base-docker",
-            type=str,
-            default="mcr.microsoft.com/azureml/openmpi4.1.0-cuda11.1-cudnn8-ubuntu18.04",
-            help="base docker image",
-        )
-        parser.add_argument("--nodes", type=int, default=None, help="number of nodes")
-        parser.add_argument("--compute-name", type=str, default=False, help="compute target name")
-
-        # register models
-        parser.add_argument("--register", type=str, default=None, help="run id")
-        parser.add_argument("--model-name", required="--register" in sys.argv, type=str, help="model name")
-        parser.add_argument(
-            "--model-path", required="--register" in sys.argv, type=str, help="model path in experiment"
-        )
+    submit_parser = commands.add_parser(
+        "submit",
+        parents=parents,
+        formatter_class=ArgumentDefaultsHelpFormatter,
+        help="submit a training command, the default: `hml azure <training command>`",
+    )
+    submit_parser.add_argument("training_command", nargs="*", help="training commands you will use on local machine.")
+    add_training_arguments(submit_parser, suppress_defaults=True)
+    submit_parser.add_argument("--data", type=str, action="append", default=SUPPRESS, help="see `hml azure -h`")
+    submit_parser.set_defaults(func=run_azure)
+
+    register_parser = commands.add_parser(
+        "register",
+        parents=parents,
+        formatter_class=ArgumentDefaultsHelpFormatter,
+        help="register models from the given runs, or the best runs of an experiment",
+    )
+    register_parser.add_argument("run_ids", type=str, nargs="*", help="run ids, or pick runs of --experiment")
+    register_parser.add_argument("--model-name", required=True, type=str, help="model name")
+    register_parser.add_argument("--model-path", required=True, type=str, help="model path in experiment")
+    # no default, so `hml azure --experiment <name> register ...` isn't overridden
+    register_parser.add_argument(
+        "--experiment", type=str, default=SUPPRESS, help="experiment to pick runs from, defaults to current directory"
+    )
+    register_parser.add_argument("--metric", type=str, default=None, help="rank runs to register by this metric")
+    register_parser.add_argument("--goal", type=str, default="max", choices=["max", "min"], help="metric goal")
+    register_parser.add_argument("--top", type=int, default=None, help="only register the best N runs")
+    register_parser.add_argument("--workers", type=int, default=8, help="number of concurrent registrations")
+    register_parser.set_defaults(func=run_azure_register)
+
+    export_parser = commands.add_parser(
+        "export",
+        parents=parents,
+        formatter_class=ArgumentDefaultsHelpFormatter,
+        help="export registered models to ONNX/TorchScript and register the result",
+    )
+    export_parser.add_argument("models", type=str, nargs="+", help="name[:version], latest version if omitted")
+    export_parser.add_argument("--format", type=str, default="onnx", choices=EXPORT_FORMATS, help="export format")
+    export_parser.add_argument("--quantize", action="store_true", help="apply dynamic int8 quantization")
+    export_parser.set_defaults(func=run_azure_export)
 
-        if "azure" in parser.prog:
-            parser.set_defaults(func=run_azure)
-        elif "aws" in parser.prog:
-            parser.set_defaults(func=run_aws)
+    pull_parser = commands.add_parser(
+        "pull",
+        parents=parents,
+        formatter_class=ArgumentDefaultsHelpFormatter,
+        help="download run output files, files already pulled are skipped",
+    )
+    pull_parser.add_argument("run_ids", type=str, nargs="+", help="run ids")
+    pull_parser.add_argument(
+        "--include", type=str, action="append", default=[], help="glob of run files to pull, `**` spans directories"
+    )
+    pull_parser.add_argument("--exclude", type=str, action="append", default=[], help="glob of run files to skip")
+    pull_parser.add_argument("--output-dir", type=str, default=".", help="directory to pull run files into")
+    pull_parser.add_argument("--workers", type=int, default=8, help="number of concurrent downloads")
+    pull_parser.set_defaults(func=run_azure_pull)
+
+    timeline_parser = commands.add_parser(
+        "timeline",
+        parents=parents,
+        formatter_class=ArgumentDefaultsHelpFormatter,
+        help="export the lifecycle of runs as a Chrome trace",
+    )
+    timeline_parser.add_argument("run_ids", type=str, nargs="+", help="run ids")
+    timeline_parser.add_argument("--trace-file", type=str, default="timeline.json", help="Chrome trace output file")
+    timeline_parser.set_defaults(func=run_azure_timeline)
+
+
+def get_azure(args: Namespace) -> AzureML:
+    if args.relogin:
+        AzureML.login(relogin=True)
+    return AzureML()
 
 
 def run_azure(args: Namespace) -> None:
     # work around solve training_command ambigiouty like "&&".
     # EX: `happifyml azure "bash script.sh && python script.py"``
     # If you do `happifyml azure bash script.sh && python script.py`, it's actually `happifyml azure bash script.sh` and `python script.py`
-    if args.relogin:
-        AzureML.login(relogin=True)
-
     if len(args.training_command) == 1:
         args.training_command = args.training_command[0].split()
 
@@ -81,7 +194,7 @@ def run_azure(args: Namespace) -> None:
                 print_error_exit(f"{item} not found.")
 
     # initialize aml and get credentials
-    aml = AzureML()
+    aml = get_azure(args)
     hf_cred = HfCredentials.get()
     wandb_cred = WandbCredentials.get()
 
@@ -95,10 +208,7 @@ def run_azure(args: Namespace) -> None:
         wandb_cred = questionary.text("Wandb API Key: ").unsafe_ask()
         WandbCredentials.save(wandb_cred)
 
-    if args.register:
-        aml.register_model(run_id=args.register, model_name=args.model_name, model_remote_path=args.model_path)
-
-    elif args.training_command:
+    if args.training_command:
         print(f"Current Workspace: {aml.credentials['workspace_name']}")
 
         # if args.nodes not specified, we simply look for "nodes" if it's in training_command.
@@ -121,11 +231,56 @@ def run_azure(args: Namespace) -> None:
             base_docker=args.base_docker,
             num_nodes=int(args.nodes),
             compute_target=args.compute_name,
+            datasets=[parse_data_spec(spec) for spec in args.data],
             hf_cred=hf_cred,
             wandb_cred=wandb_cred,
         )
 
 
+def run_azure_register(args: Namespace) -> None:
+    if not args.run_ids and args.metric is None and args.top is None:
+        print_error_exit(
+            f"Please specify run ids, or --metric/--top to pick the best runs of experiment '{args.experiment}'"
+        )
+
+    rows = get_azure(args).register_models(
+        model_name=args.model_name,
+        model_remote_path=args.model_path,
+        run_ids=args.run_ids,
+        experiment_name=args.experiment,
+        metric=args.metric,
+        top=args.top,
+        goal=args.goal,
+        max_workers=args.workers,
+    )
+
+    failed = [row for row in rows if row["status"].startswith("failed")]
+    if failed:
+        print_error_exit(f"Failed to register {len(failed)}/{len(rows)} runs")
+    if not rows:
+        print_error_exit(f"No runs of experiment '{args.experiment}' to register")
+
+
+def run_azure_export(args: Namespace) -> None:
+    aml = get_azure(args)
+    for model in args.models:
+        model_name, _, version = model.partition(":")
+        version = int(version) if version else None
+        aml.export(model_name, version=version, export_format=args.format, quantize=args.quantize)
+
+
+def run_azure_pull(args: Namespace) -> None:
+    stats = get_azure(args).pull(
+        args.run_ids, output_dir=args.output_dir, include=args.include, exclude=args.exclude, max_workers=args.workers
+    )
+    if stats["failed"]:
+        print_error_exit(f"Failed to pull {len(stats['failed'])} runs or files")
+
+
+def run_azure_timeline(args: Namespace) -> None:
+    get_azure(args).timeline(args.run_ids, path=args.trace_file)
+
+
 def run_aws(args: Namespace) -> None:
     raise NotImplementedError
 
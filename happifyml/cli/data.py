@@ -0,0 +1,78 @@
+from argparse import ArgumentDefaultsHelpFormatter, ArgumentParser, Namespace
+from typing import List
+
+from happifyml.utils import print_error_exit, print_success
+
+from ..data import AzureDatastore, LocalDatastore, pull, push
+from ..integrations import AzureML
+from . import SubParserAction
+
+
+def register(subparsers: SubParserAction, parents: List[ArgumentParser]) -> None:
+    """
+    Examples:
+    1. upload a new dataset version, only changed files are uploaded
+    `hml data push ./corpus --name corpus`
+
+    2. download a dataset version, files already present locally are skipped
+    `hml data pull corpus:3 ./corpus`
+
+    """
+    parser = subparsers.add_parser(
+        "data",
+        parents=parents,
+        help="sync datasets with the Azure ML datastore",
+        formatter_class=ArgumentDefaultsHelpFormatter,
+    )
+    parsers = parser.add_subparsers()
+
+    push_parser = parsers.add_parser(
+        "push", parents=parents, formatter_class=ArgumentDefaultsHelpFormatter, help="upload a dataset version"
+    )
+    push_parser.add_argument("path", type=str, help="local dataset directory")
+    push_parser.add_argument("--name", type=str, required=True, help="dataset name")
+    push_parser.add_argument("--version", type=int, default=None, help="dataset version, defaults to latest + 1")
+    push_parser.set_defaults(func=run_push)
+
+    pull_parser = parsers.add_parser(
+        "pull", parents=parents, formatter_class=ArgumentDefaultsHelpFormatter, help="download a dataset version"
+    )
+    pull_parser.add_argument("dataset", type=str, help="name:version")
+    pull_parser.add_argument("path", type=str, help="local dataset directory")
+    pull_parser.set_defaults(func=run_pull)
+
+    for sub_parser in [push_parser, pull_parser]:
+        sub_parser.add_argument("--datastore", type=str, default=None, help="datastore name, defaults to workspace's")
+        sub_parser.add_argument("--local-datastore", type=str, default=None, help="use a local directory instead")
+
+
+def get_datastore(args: Namespace):
+    if args.local_datastore:
+        return LocalDatastore(args.local_datastore)
+
+    aml = AzureML()
+    if args.datastore:
+        from azureml.core import Datastore
+
+        return AzureDatastore(Datastore.get(aml.workspace, args.datastore))
+    return AzureDatastore(aml.workspace.get_default_datastore())
+
+
+def run_push(args: Namespace) -> None:
+    stats = push(get_datastore(args), args.path, args.name, args.version)
+    print_success(
+        f"✅ Pushed {args.name}:{stats['version']}, uploaded {stats['uploaded']}/{stats['files']} files "
+        f"({stats['uploaded_bytes'] / 2**20:.1f} MB)"
+    )
+
+
+def run_pull(args: Namespace) -> None:
+    name, _, version = args.dataset.partition(":")
+    if not version.isdigit():
+        print_error_exit(f"Invalid dataset '{args.dataset}', expected name:version")
+
+    stats = pull(get_datastore(args), name, int(version), args.path)
+    print_success(
+        f"✅ Pulled {name}:{version} to {args.path}, downloaded {stats['downloaded']}/{stats['files']} files "
+        f"({stats['downloaded_bytes'] / 2**20:.1f} MB)"
+    )
@@ -1,10 +1,15 @@
 from argparse import ArgumentDefaultsHelpFormatter, ArgumentParser, Namespace
-from typing import List
+from typing import Dict, List, Optional
 
-from happifyml.utils import print_error_exit, print_success, print_success_exit
+from happifyml.utils import AzureCredentials, print_error_exit, print_success, print_success_exit
 
 from . import SubParserAction
 
+# shared volume the prefetch init container warms and the serving container loads models from
+MODEL_CACHE_VOLUME = "happifyml-cache"
+MODEL_CACHE_MOUNT = "/mnt/happifyml-cache"
+WORKSPACE_KEYS = ("subscription_id", "resource_group", "workspace_name")
+
 
 def register(subparsers: SubParserAction, parents: List[ArgumentParser]) -> None:
     """
@@ -15,6 +20,13 @@ def register(subparsers: SubParserAction, parents: List[ArgumentParser]) -> None
     2. create deployment repo
     `happifyml init deployment`
 
+    3. prefetch models before the serving container starts, in the deployment config:
+        prefetch:
+          models: [intent-classifier:3, sentiment]
+          convert: true
+          # optional, defaults to the workspace you're logged in to
+          workspace: {subscription_id: ..., resource_group: ..., workspace_name: ...}
+
     """
     parser = subparsers.add_parser(
         "deploy",
@@ -28,9 +40,56 @@ def register(subparsers: SubParserAction, parents: List[ArgumentParser]) -> None
     parser.set_defaults(func=run_deployment)
 
 
+def prefetch_init_container(config: Dict, credentials: Optional[Dict] = None) -> Optional[Dict]:
+    """
+    Init container running `hml models prefetch` for the `prefetch` field of a deployment config,
+    so replicas start with their models already in the shared cache.
+    The container can't be prompted for a workspace, it's given `prefetch.workspace` or else `credentials`,
+    the workspace the deployment is made from.
+    """
+    prefetch = config.get("prefetch")
+    if not prefetch:
+        return None
+    if not prefetch.get("models"):
+        raise ValueError("prefetch.models must list the models to prefetch as name[:version]")
+
+    workspace = prefetch.get("workspace") or credentials or {}
+    missing = [key for key in WORKSPACE_KEYS if not workspace.get(key)]
+    if missing:
+        raise ValueError(
+            f"prefetch needs an Azure ML workspace, log in with `hml azure --relogin` or set prefetch.workspace "
+            f"({', '.join(missing)} missing)"
+        )
+
+    command = ["hml", "models", "prefetch", *map(str, prefetch["models"])]
+    for key in WORKSPACE_KEYS:
+        command.extend([f"--{key.replace('_', '-')}", str(workspace[key])])
+    if prefetch.get("convert"):
+        command.append("--convert")
+    if prefetch.get("workers"):
+        command.extend(["--workers", str(prefetch["workers"])])
+
+    return {
+        "name": "hml-prefetch",
+        "image": config.get("image"),
+        "command": command,
+        "env": [{"name": "HAPPIFYML_CACHE", "value": MODEL_CACHE_MOUNT}],
+        "volumeMounts": [{"name": MODEL_CACHE_VOLUME, "mountPath": MODEL_CACHE_MOUNT}],
+    }
+
+
 def run_deployment(args: Namespace) -> None:
     import time
 
+    import yaml
+
+    with open(args.config) as f:
+        config = yaml.safe_load(f) or {}
+
+    init_container = prefetch_init_container(config, AzureCredentials.get())
+    if init_container:
+        print(f"⌛ Prefetching models in init container: {' '.join(init_container['command'])}")
+
     print("⌛ Allocating Kubernetes resources...")
     time.sleep(4)
     print("✅ View deployment: http://localhost:8888/")
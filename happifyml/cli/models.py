@@ -0,0 +1,53 @@
+from argparse import ArgumentDefaultsHelpFormatter, ArgumentParser, Namespace
+from typing import List
+
+from happifyml.utils import print_error_exit, print_success
+
+from ..integrations import AzureML
+from . import SubParserAction
+
+
+def register(subparsers: SubParserAction, parents: List[ArgumentParser]) -> None:
+    """
+    Examples:
+    1. warm the shared model cache, e.g. on a new cluster node or before a deployment starts
+    `hml models prefetch intent-classifier:3 sentiment`
+
+    2. also convert them to memory-mappable shards for `from_pretrained(..., low_memory=True)`
+    `hml models prefetch intent-classifier:3 --convert`
+
+    """
+    parser = subparsers.add_parser(
+        "models",
+        parents=parents,
+        help="manage registered models",
+        formatter_class=ArgumentDefaultsHelpFormatter,
+    )
+    parsers = parser.add_subparsers()
+
+    prefetch_parser = parsers.add_parser(
+        "prefetch",
+        parents=parents,
+        formatter_class=ArgumentDefaultsHelpFormatter,
+        help="download registered models into the shared local cache",
+    )
+    prefetch_parser.add_argument("models", type=str, nargs="+", help="name[:version], latest version if omitted")
+    prefetch_parser.add_argument("--convert", action="store_true", help="convert to the fast-load sharded format")
+    prefetch_parser.add_argument("--workers", type=int, default=4, help="parallel downloads")
+    prefetch_parser.add_argument(
+        "--cache-dir", type=str, default=None, help="model cache, defaults to $HAPPIFYML_CACHE/models"
+    )
+    prefetch_parser.add_argument("--subscription-id", type=str, default=None, help="defaults to the logged in one")
+    prefetch_parser.add_argument("--resource-group", type=str, default=None, help="defaults to the logged in one")
+    prefetch_parser.add_argument("--workspace-name", type=str, default=None, help="defaults to the logged in one")
+    prefetch_parser.set_defaults(func=run_prefetch)
+
+
+def run_prefetch(args: Namespace) -> None:
+    aml = AzureML(args.subscription_id, args.resource_group, args.workspace_name)
+    results = aml.prefetch(args.models, args.convert, args.workers, args.cache_dir)
+
+    failed = [spec for spec, result in results.items() if isinstance(result, Exception)]
+    if failed:
+        print_error_exit(f"Failed to prefetch {len(failed)}/{len(results)} models: {', '.join(failed)}")
+    print_success(f"✅ Prefetched {len(results)} models")
@@ -1,4 +1,5 @@
 import os
+import shutil
 from argparse import ArgumentDefaultsHelpFormatter, ArgumentParser, Namespace
 from pathlib import Path
 from typing import List
@@ -71,17 +72,15 @@ def register(subparsers: SubParserAction, parents: List[ArgumentParser]) -> None
 
 
 def init_project(args: Namespace) -> None:
-    raise NotImplementedError
-    # path = args.name
+    path = args.name
 
-    # if not os.path.isdir(path):
-    #     _ask_create(path)
+    if not os.path.isdir(path):
+        _ask_create(path)
 
-    # elif os.path.exists(path):
-    #     # if len(os.listdir(path)) > 0:
-    #     _ask_overwrite(path)
+    elif len(os.listdir(path)) > 0:
+        _ask_overwrite(path)
 
-    # create_project(path)
+    create_project(path)
 
 
 def _ask_create(path):
@@ -105,19 +104,12 @@ def _ask_overwrite(path):
 
 
 def create_project(path) -> None:
-    from distutils.dir_util import copy_tree, remove_tree
+    template_path = Path(__file__).parents[1] / "templates" / "project"
+    shutil.copytree(template_path, path, dirs_exist_ok=True, ignore=shutil.ignore_patterns("_*", "*.pyc"))
 
-    import pkg_resources
-
-    os.chdir(path)
-    template_path = pkg_resources.resource_filename(__name__, " ")
-    template_path = Path(template_path).parents[1] / "templates" / "pl_research_template"
-    copy_tree(template_path, ".")
-
-    for parent, dirnames, filenames in os.walk("."):
-        for dirname in dirnames:
-            if dirname.startswith("_"):
-                remove_tree(os.path.join(parent, dirname))
-    os.remove(".git")
+    project_name = Path(path).resolve().name
+    for filename in ["README.md", "environment.yaml"]:
+        file_path = Path(path) / filename
+        file_path.write_text(file_path.read_text().replace("{{project_name}}", project_name))
 
     print(f"🔥 Project created at `{path}`. Have fun coding!")
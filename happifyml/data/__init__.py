@@ -0,0 +1,2 @@
+from .cache import TokenizedCache, benchmark_throughput, files_fingerprint, tokenizer_fingerprint
+from .sync import AzureDatastore, LocalDatastore, parse_data_spec, pull, push, resolve
@@ -0,0 +1,205 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+import torch
+
+from ..utils.locks import file_lock
+
+DEFAULT_CACHE_DIR = os.path.join(
+    os.environ.get("HAPPIFYML_CACHE", os.path.expanduser("~/.happifyml/cache")), "tokenized"
+)
+
+TOKENS_FILE = "tokens.bin"
+OFFSETS_FILE = "offsets.npy"
+META_FILE = "meta.json"  # written last, its presence marks a complete cache
+
+
+def tokenizer_fingerprint(tokenizer: Any) -> str:
+    """
+    Hash of everything that changes the produced token ids: tokenizer class and its vocab/serialized pipeline.
+    """
+    h = hashlib.sha256(type(tokenizer).__qualname__.encode())
+    if hasattr(tokenizer, "backend_tokenizer"):
+        # hf fast tokenizers serialize normalizer, pre-tokenizer, model and post-processor
+        h.update(tokenizer.backend_tokenizer.to_str().encode())
+    elif hasattr(tokenizer, "get_vocab"):
+        h.update(json.dumps(sorted(tokenizer.get_vocab().items())).encode())
+    else:
+        h.update(repr(sorted(vars(tokenizer).items())).encode())
+    return h.hexdigest()
+
+
+def files_fingerprint(paths: Sequence[str]) -> str:
+    """
+    Cheap dataset fingerprint from file paths, sizes and modification times.
+    """
+    h = hashlib.sha256()
+    for path in sorted(paths):
+        stat = os.stat(path)
+        h.update(f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+    return h.hexdigest()
+
+
+class TokenizedCache:
+    """
+    Pre-tokenized corpus stored as one flat memory-mapped array of token ids plus an offsets index.
+
+    Documents and batches are numpy/torch views over the mmap, nothing is copied into process memory.
+    Build it once per node with `TokenizedCache.build(...)`, every rank on the node then shares the same pages.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, META_FILE)) as f:
+            self.meta = json.load(f)
+
+        if self.meta["num_tokens"]:
+            # copy-on-write maps are writable from torch's point of view, pages are only copied if someone writes
+            self.tokens = np.memmap(
+                os.path.join(path, TOKENS_FILE), dtype=self.meta["dtype"], mode="c", shape=(self.meta["num_tokens"],)
+            )
+        else:
+            # empty corpus (or only empty documents), an empty file can't be mapped
+            self.tokens = np.zeros(0, dtype=self.meta["dtype"])
+        self.offsets = np.load(os.path.join(path, OFFSETS_FILE), mmap_mode="c")
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> np.ndarray:
+        return self.tokens[self.offsets[index] : self.offsets[index + 1]]
+
+    @property
+    def num_tokens(self) -> int:
+        return self.meta["num_tokens"]
+
+    def iter_batches(
+        self, batch_size: int, seq_len: int, rank: int = 0, world_size: int = 1
+    ) -> Iterator[torch.Tensor]:
+        """
+        Yield `(batch_size, seq_len)` blocks of the concatenated token stream, strided across ranks.
+        The trailing partial batch is dropped so every rank sees the same number of batches.
+        """
+        num_blocks = self.num_tokens // seq_len
+        blocks = self.tokens[: num_blocks * seq_len].reshape(num_blocks, seq_len)
+        num_batches = num_blocks // batch_size // world_size * world_size
+
+        for i in range(rank, num_batches, world_size):
+            yield torch.from_numpy(blocks[i * batch_size : (i + 1) * batch_size])
+
+    @classmethod
+    def build(
+        cls,
+        texts: Iterable[str],
+        tokenizer: Any,
+        dataset_fingerprint: Optional[str] = None,
+        cache_dir: str = DEFAULT_CACHE_DIR,
+        local_rank: Optional[int] = None,
+        timeout: float = 6 * 3600,
+        poll_interval: float = 5.0,
+        chunk_size: int = 1000,
+    ) -> "TokenizedCache":
+        """
+        Return the cache for (`tokenizer`, dataset), tokenizing `texts` only if it doesn't exist yet.
+
+        Local rank 0 (`LOCAL_RANK`, as set by `set_az_pl_environment_variables`) builds the cache under an
+        exclusive file lock, other ranks wait on the same lock and never touch `texts`.
+        `dataset_fingerprint` is required unless `texts` is a list, see `files_fingerprint`.
+        """
+        if dataset_fingerprint is None:
+            if not isinstance(texts, (list, tuple)):
+                raise ValueError("dataset_fingerprint is required when texts is not a list")
+            dataset_fingerprint = hashlib.sha256("\0".join(texts).encode()).hexdigest()
+
+        key = hashlib.sha256((tokenizer_fingerprint(tokenizer) + dataset_fingerprint).encode()).hexdigest()[:16]
+        path = os.path.join(cache_dir, key)
+        if os.path.exists(os.path.join(path, META_FILE)):
+            return cls(path)
+
+        if local_rank is None:
+            local_rank = int(os.environ.get("LOCAL_RANK", 0))
+
+        os.makedirs(cache_dir, exist_ok=True)
+        lock_path = path + ".lock"
+
+        if local_rank == 0:
+            with file_lock(lock_path):
+                if not os.path.exists(os.path.join(path, META_FILE)):
+                    cls._write(path, texts, tokenizer, chunk_size)
+        else:
+            deadline = time.monotonic() + timeout
+            while True:
+                with file_lock(lock_path, shared=True):
+                    if os.path.exists(os.path.join(path, META_FILE)):
+                        break
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"Timed out waiting for local rank 0 to build {path}")
+                time.sleep(poll_interval)
+
+        return cls(path)
+
+    @staticmethod
+    def _write(path: str, texts: Iterable[str], tokenizer: Any, chunk_size: int) -> None:
+        tmp_path = f"{path}.tmp-{os.getpid()}"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+
+        offsets = [0]
+        with open(os.path.join(tmp_path, TOKENS_FILE), "wb") as f:
+            for chunk in _chunks(texts, chunk_size):
+                for ids in _encode(tokenizer, chunk):
+                    np.asarray(ids, dtype=np.int32).tofile(f)
+                    offsets.append(offsets[-1] + len(ids))
+
+        np.save(os.path.join(tmp_path, OFFSETS_FILE), np.asarray(offsets, dtype=np.int64))
+        with open(os.path.join(tmp_path, META_FILE), "w") as f:
+            json.dump({"dtype": "int32", "num_tokens": offsets[-1], "num_documents": len(offsets) - 1}, f)
+
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(tmp_path, path)
+
+
+def _chunks(texts: Iterable[str], size: int) -> Iterator[List[str]]:
+    chunk = []
+    for text in texts:
+        chunk.append(text)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _encode(tokenizer: Any, texts: List[str]) -> List[List[int]]:
+    # hf tokenizers encode a whole batch at once (in parallel for fast tokenizers)
+    if callable(tokenizer):
+        return tokenizer(texts)["input_ids"]
+    return [tokenizer.encode(text) for text in texts]
+
+
+def benchmark_throughput(
+    cache: TokenizedCache, batch_size: int, seq_len: int, max_batches: Optional[int] = None
+) -> Dict[str, float]:
+    """
+    Measure how fast batches stream out of the cache, touching every token of every batch.
+    """
+    num_batches = 0
+    checksum = 0
+    start = time.perf_counter()
+    for batch in cache.iter_batches(batch_size, seq_len):
+        checksum += int(batch.sum())
+        num_batches += 1
+        if max_batches and num_batches >= max_batches:
+            break
+    elapsed = max(time.perf_counter() - start, 1e-9)
+
+    return {
+        "batches_per_sec": num_batches / elapsed,
+        "tokens_per_sec": num_batches * batch_size * seq_len / elapsed,
+        "elapsed_sec": elapsed,
+    }
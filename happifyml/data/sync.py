@@ -0,0 +1,313 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+
+from ..utils.retry import RemoteCall
+
+DATASETS_PREFIX = "datasets"
+MODES = ("mount", "download")
+
+# objects are content addressed and written with overwrite, so uploads are idempotent too
+_upload_files = RemoteCall("datastore.upload_files")
+_download = RemoteCall("datastore.download", timeout=3600)
+
+# Remote layout, objects are content addressed so unchanged files are shared by every version:
+#   datasets/<name>/objects/<sha256[:2]>/<sha256>
+#   datasets/<name>/<version>/manifest.json   {relative path: {"sha256": ..., "size": ...}}
+#   datasets/<name>/versions.json             [1, 2, ...], written last so a version is only visible once complete
+
+
+def object_path(name: str, sha256: str) -> str:
+    return f"{DATASETS_PREFIX}/{name}/objects/{sha256[:2]}/{sha256}"
+
+
+def manifest_path(name: str, version: int) -> str:
+    return f"{DATASETS_PREFIX}/{name}/{version}/manifest.json"
+
+
+def versions_path(name: str) -> str:
+    return f"{DATASETS_PREFIX}/{name}/versions.json"
+
+
+def parse_data_spec(spec: str) -> Tuple[str, int, str]:
+    """
+    Parse `name:version[:mount|download]`, mode defaults to mount.
+    """
+    parts = spec.split(":")
+    if len(parts) not in (2, 3) or not parts[1].isdigit():
+        raise ValueError(f"Invalid dataset '{spec}', expected name:version[:mount|download]")
+
+    mode = parts[2] if len(parts) == 3 else "mount"
+    if mode not in MODES:
+        raise ValueError(f"Invalid dataset mode '{mode}', expected one of {MODES}")
+    return parts[0], int(parts[1]), mode
+
+
+def file_sha256(path: str, chunk_size: int = 2**20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def build_manifest(local_dir: str) -> Dict[str, Dict]:
+    manifest = {}
+    for root, dirs, files in os.walk(local_dir):
+        for filename in files:
+            path = os.path.join(root, filename)
+            relpath = os.path.relpath(path, local_dir).replace(os.sep, "/")
+            manifest[relpath] = {"sha256": file_sha256(path), "size": os.path.getsize(path)}
+    return manifest
+
+
+class LocalDatastore:
+    """
+    Directory-backed datastore with the same interface as `AzureDatastore`, for tests and shared filesystems.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, remote_path: str) -> str:
+        return os.path.join(self.root, *remote_path.split("/"))
+
+    def read_text(self, remote_path: str) -> Optional[str]:
+        try:
+            with open(self._path(remote_path)) as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def write_text(self, remote_path: str, text: str) -> None:
+        os.makedirs(os.path.dirname(self._path(remote_path)), exist_ok=True)
+        with open(self._path(remote_path), "w") as f:
+            f.write(text)
+
+    def upload(self, files: Dict[str, str]) -> None:
+        for remote_path, local_path in files.items():
+            os.makedirs(os.path.dirname(self._path(remote_path)), exist_ok=True)
+            shutil.copyfile(local_path, self._path(remote_path))
+
+    def download(self, files: Dict[str, str]) -> None:
+        for remote_path, local_path in files.items():
+            os.makedirs(os.path.dirname(os.path.abspath(local_path)), exist_ok=True)
+            shutil.copyfile(self._path(remote_path), local_path)
+
+
+class AzureDatastore:
+    """
+    Azure ML blob datastore, `datastore` is an `azureml.core.Datastore` such as `workspace.get_default_datastore()`.
+    """
+
+    def __init__(self, datastore, max_workers: int = 16):
+        self.datastore = datastore
+        self.max_workers = max_workers
+
+    def read_text(self, remote_path: str) -> Optional[str]:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            local_path = os.path.join(tmp_dir, "file")
+            self.download({remote_path: local_path})
+            if not os.path.exists(local_path):
+                return None
+            with open(local_path) as f:
+                return f.read()
+
+    def write_text(self, remote_path: str, text: str) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            local_path = os.path.join(tmp_dir, "file")
+            with open(local_path, "w") as f:
+                f.write(text)
+            self.upload({remote_path: local_path})
+
+    def upload(self, files: Dict[str, str]) -> None:
+        if not files:
+            return
+
+        # `upload_files` keeps paths relative to `relative_root`, so lay files out under their remote names first.
+        # Hard links make the staging free on the same filesystem.
+        with tempfile.TemporaryDirectory() as staging:
+            staged = []
+            for remote_path, local_path in files.items():
+                staged_path = os.path.join(staging, *remote_path.split("/"))
+                os.makedirs(os.path.dirname(staged_path), exist_ok=True)
+                try:
+                    os.link(local_path, staged_path)
+                except OSError:
+                    shutil.copyfile(local_path, staged_path)
+                staged.append(staged_path)
+
+            _upload_files(
+                self.datastore.upload_files,
+                staged,
+                relative_root=staging,
+                target_path="",
+                overwrite=True,
+                show_progress=len(staged) > 1,
+            )
+
+    def download(self, files: Dict[str, str]) -> None:
+        def download_one(item):
+            remote_path, local_path = item
+            with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(local_path))) as tmp_dir:
+                _download(self.datastore.download, tmp_dir, prefix=remote_path, overwrite=True, show_progress=False)
+                downloaded = os.path.join(tmp_dir, *remote_path.split("/"))
+                if os.path.exists(downloaded):
+                    os.replace(downloaded, local_path)
+
+        for local_path in files.values():
+            os.makedirs(os.path.dirname(os.path.abspath(local_path)), exist_ok=True)
+
+        with ThreadPoolExecutor(self.max_workers) as executor:
+            list(executor.map(download_one, files.items()))
+
+
+def list_versions(datastore, name: str) -> list:
+    return json.loads(datastore.read_text(versions_path(name)) or "[]")
+
+
+def read_manifest(datastore, name: str, version: int) -> Dict[str, Dict]:
+    manifest = datastore.read_text(manifest_path(name, version))
+    if manifest is None:
+        raise FileNotFoundError(f"Dataset {name}:{version} not found")
+    return json.loads(manifest)
+
+
+def push(datastore, local_dir: str, name: str, version: Optional[int] = None) -> Dict:
+    """
+    Upload `local_dir` as a new version of dataset `name`.
+    Only files whose content isn't already stored by the latest version are uploaded.
+    """
+    if not os.path.isdir(local_dir):
+        raise NotADirectoryError(f"{local_dir} is not a directory")
+
+    versions = list_versions(datastore, name)
+    if version is None:
+        version = max(versions, default=0) + 1
+    elif version in versions:
+        raise ValueError(f"Dataset {name}:{version} already exists")
+
+    manifest = build_manifest(local_dir)
+    stored = set()
+    if versions:
+        stored = {entry["sha256"] for entry in read_manifest(datastore, name, max(versions)).values()}
+
+    uploads = {}
+    for relpath, entry in manifest.items():
+        if entry["sha256"] not in stored:
+            uploads[object_path(name, entry["sha256"])] = os.path.join(local_dir, relpath)
+
+    datastore.upload(uploads)
+    datastore.write_text(manifest_path(name, version), json.dumps(manifest, indent=2, sort_keys=True))
+    datastore.write_text(versions_path(name), json.dumps(sorted(versions + [version])))
+
+    return {
+        "version": version,
+        "files": len(manifest),
+        "uploaded": len(uploads),
+        "uploaded_bytes": sum(os.path.getsize(path) for path in uploads.values()),
+    }
+
+
+def pull(datastore, name: str, version: int, local_dir: str) -> Dict:
+    """
+    Download dataset `name:version` into `local_dir`, skipping files already present with the same content.
+    """
+    manifest = read_manifest(datastore, name, version)
+
+    # several files may share one object, download it once and copy it to the other paths
+    pending = {}
+    for relpath, entry in manifest.items():
+        local_path = os.path.join(local_dir, *relpath.split("/"))
+        if os.path.exists(local_path) and os.path.getsize(local_path) == entry["size"]:
+            if file_sha256(local_path) == entry["sha256"]:
+                continue
+        pending.setdefault(object_path(name, entry["sha256"]), (entry["size"], []))[1].append(local_path)
+
+    datastore.download({remote_path: local_paths[0] for remote_path, (size, local_paths) in pending.items()})
+    for size, local_paths in pending.values():
+        for local_path in local_paths[1:]:
+            os.makedirs(os.path.dirname(os.path.abspath(local_path)), exist_ok=True)
+            shutil.copyfile(local_paths[0], local_path)
+
+    return {
+        "version": version,
+        "files": len(manifest),
+        "downloaded": len(pending),
+        "downloaded_bytes": sum(size for size, local_paths in pending.values()),
+    }
+
+
+def materialize(manifest: Dict[str, Dict], dataset_root: str, target_dir: str) -> str:
+    """
+    Recreate the dataset tree in `target_dir` as symlinks into the objects of `dataset_root`,
+    the local copy (mounted or downloaded) of the `datasets/<name>` prefix. Mounted files stay lazily read.
+    """
+    for relpath, entry in manifest.items():
+        link = os.path.join(target_dir, *relpath.split("/"))
+        os.makedirs(os.path.dirname(link), exist_ok=True)
+        if not os.path.lexists(link):
+            sha256 = entry["sha256"]
+            os.symlink(os.path.join(dataset_root, "objects", sha256[:2], sha256), link)
+    return target_dir
+
+
+def find_dataset_root(input_root: str, version: str) -> str:
+    """
+    Directory holding `<version>/manifest.json` and `objects/` in the local copy of a dataset.
+    A mounted input is the `datasets/<name>` prefix itself, so it's checked directly rather than listing
+    the whole (lazily read) mount; downloaded inputs may keep more of the datastore path above it.
+    """
+    if os.path.isfile(os.path.join(input_root, version, "manifest.json")):
+        return input_root
+
+    for root, dirs, files in os.walk(input_root):
+        # object trees are the bulk of a dataset and never hold manifests
+        dirs[:] = [d for d in dirs if d != "objects"]
+        if os.path.basename(root) == version and "manifest.json" in files:
+            return os.path.dirname(root)
+
+    raise FileNotFoundError(f"manifest of version {version} not found under {input_root}")
+
+
+def resolve(name: str, target_dir: Optional[str] = None) -> str:
+    """
+    Inside a job submitted with `hml azure --data name:version[:mode]`, return a local directory
+    holding the dataset files.
+    """
+    from azureml.core.run import Run
+
+    version = os.environ[data_environment_variable(name)]
+    dataset_root = find_dataset_root(Run.get_context().input_datasets[name], version)
+
+    with open(os.path.join(dataset_root, version, "manifest.json")) as f:
+        manifest = json.load(f)
+    target_dir = target_dir or tempfile.mkdtemp(prefix=f"{name}-{version}-")
+    return materialize(manifest, dataset_root, target_dir)
+
+
+def data_environment_variable(name: str) -> str:
+    return "HML_DATA_" + "".join(c if c.isalnum() else "_" for c in name).upper()
+
+
+def as_run_input(workspace_datastore, name: str, version: int, mode: str, datastore: Optional[AzureDatastore] = None):
+    """
+    Azure ML dataset input for `name:version`, consumed inside the job with `resolve(name)`.
+    Mount exposes the whole dataset prefix lazily (huge, sparsely read corpora), download copies only the
+    manifest and objects of this version to local disk before the job starts (small, hot datasets).
+    """
+    from azureml.core import Dataset
+
+    if mode == "mount":
+        paths = [(workspace_datastore, f"{DATASETS_PREFIX}/{name}/")]
+    else:
+        manifest = read_manifest(datastore or AzureDatastore(workspace_datastore), name, version)
+        objects = sorted({object_path(name, entry["sha256"]) for entry in manifest.values()})
+        paths = [(workspace_datastore, path) for path in [manifest_path(name, version)] + objects]
+
+    dataset = Dataset.File.from_files(path=paths, validate=False).as_named_input(name)
+    return dataset.as_mount() if mode == "mount" else dataset.as_download()
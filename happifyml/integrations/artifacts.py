@@ -0,0 +1,200 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from fnmatch import fnmatch
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from ..data.sync import file_sha256
+from ..utils.memory import format_size
+from ..utils.retry import RemoteCall
+
+# records what was downloaded into an output directory, so pulling again only fetches new files
+MANIFEST_NAME = ".hml_pull.json"
+
+_get_file_names = RemoteCall("run.get_file_names", timeout=60, hedge_after=5)
+_download_file = RemoteCall("run.download_file")
+
+
+def match_file(name: str, pattern: str) -> bool:
+    """
+    Glob match of a `/` separated run file name. `*`, `?` and `[...]` never match `/`, `**` matches any
+    number of directories, so `eval/*.json` matches `eval/a.json` but not `eval/sub/b.json` (`eval/**/*.json`).
+    Patterns without a `/` match the file name in any directory, like `*.ckpt`.
+    """
+    parts = name.split("/")
+    if "/" not in pattern:
+        return fnmatch(parts[-1], pattern)
+    return _match_parts(parts, pattern.strip("/").split("/"))
+
+
+def _match_parts(parts: List[str], patterns: List[str]) -> bool:
+    if not patterns:
+        return not parts
+    if patterns[0] == "**":
+        return any(_match_parts(parts[i:], patterns[1:]) for i in range(len(parts) + 1))
+    return bool(parts) and fnmatch(parts[0], patterns[0]) and _match_parts(parts[1:], patterns[1:])
+
+
+def filter_files(
+    names: Iterable[str], include: Optional[Sequence[str]] = None, exclude: Optional[Sequence[str]] = None
+) -> List[str]:
+    include = include or ["*"]
+    exclude = exclude or []
+    return [
+        name
+        for name in names
+        if any(match_file(name, pattern) for pattern in include)
+        and not any(match_file(name, pattern) for pattern in exclude)
+    ]
+
+
+def run_files(run, path: str, file_names: Optional[Sequence[str]] = None) -> List[str]:
+    """
+    Output files of `run` under `path` (a file or directory of the run's outputs), sorted.
+    """
+    if file_names is None:
+        file_names = _get_file_names(run.get_file_names)
+
+    prefix = path.rstrip("/")
+    return sorted(name for name in file_names if name == prefix or name.startswith(prefix + "/"))
+
+
+def artifact_id(run, path: str, file_names: Optional[Sequence[str]] = None) -> str:
+    """
+    Identity of the files under `path` in a run's outputs, stored as the `artifact_id` model tag.
+    It hashes the run id and file listing, not file contents: AML doesn't expose hashes of run files and run outputs
+    are write-once, so it tells whether this artifact of this run is already registered without downloading it.
+    The same checkpoint in two runs gets two different ids.
+    """
+    return hashlib.sha256("\n".join([run.id] + run_files(run, path, file_names)).encode()).hexdigest()
+
+
+def _file_entry(path: str) -> Dict:
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": file_sha256(path)}
+
+
+def _is_up_to_date(path: str, entry: Optional[Dict]) -> bool:
+    if not entry or not os.path.exists(path):
+        return False
+    stat = os.stat(path)
+    if stat.st_size != entry["size"]:
+        return False
+    # untouched since we downloaded it, otherwise compare content
+    return stat.st_mtime_ns == entry["mtime_ns"] or file_sha256(path) == entry["sha256"]
+
+
+def _load_manifest(output_dir: str) -> Dict:
+    try:
+        with open(os.path.join(output_dir, MANIFEST_NAME)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def _save_manifest(output_dir: str, manifest: Dict) -> None:
+    with open(os.path.join(output_dir, MANIFEST_NAME), "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+
+def _download(run, name: str, local_path: str) -> Dict:
+    _download_file(run.download_file, name, output_file_path=local_path)
+    return _file_entry(local_path)
+
+
+def pull_runs(
+    runs: List,
+    output_dir: str,
+    include: Optional[Sequence[str]] = None,
+    exclude: Optional[Sequence[str]] = None,
+    max_workers: int = 8,
+) -> Dict:
+    """
+    Download output files of `runs` matching `include`/`exclude` globs into `output_dir/<run id>/`.
+
+    Each run's file list is fetched once, all downloads share one bounded worker pool.
+    Run outputs are immutable once written, so files already downloaded and unchanged locally are skipped.
+    A run whose file list can't be fetched is reported in `failed` and the others are still pulled.
+    """
+    start = time.perf_counter()
+    stats = {"runs": len(runs), "files": 0, "downloaded": 0, "skipped": 0, "bytes": 0, "failed": []}
+
+    lock = threading.Lock()
+    manifests, remaining, unsaved = {}, {}, set()
+
+    def save(run_id):
+        _save_manifest(os.path.join(output_dir, run_id), manifests[run_id])
+        unsaved.discard(run_id)
+
+    def download(run, name, local_path):
+        try:
+            entry = _download(run, name, local_path)
+            with lock:
+                manifests[run.id][name] = entry
+                unsaved.add(run.id)
+            return entry
+        finally:
+            with lock:
+                remaining[run.id] -= 1
+                # saved as soon as the run's downloads are done, not only at the end of the whole pull
+                if not remaining[run.id] and run.id in unsaved:
+                    save(run.id)
+
+    executor = ThreadPoolExecutor(max_workers)
+    futures = {}
+    try:
+        listings = [executor.submit(_get_file_names, run.get_file_names) for run in runs]
+        for run, listing in zip(runs, listings):
+            try:
+                names = listing.result()
+            except Exception as e:
+                print(f"❌ {run.id}: {e.__class__.__name__}: {e}")
+                stats["failed"].append(run.id)
+                continue
+
+            run_dir = os.path.join(output_dir, run.id)
+            manifests[run.id] = _load_manifest(run_dir)
+            pending = []
+            for name in filter_files(names, include, exclude):
+                stats["files"] += 1
+                local_path = os.path.join(run_dir, *name.split("/"))
+                if _is_up_to_date(local_path, manifests[run.id].get(name)):
+                    stats["skipped"] += 1
+                else:
+                    pending.append((name, local_path))
+
+            remaining[run.id] = len(pending)
+            for name, local_path in pending:
+                os.makedirs(os.path.dirname(local_path), exist_ok=True)
+                futures[executor.submit(download, run, name, local_path)] = (run.id, name)
+
+        for future in as_completed(futures):
+            run_id, name = futures[future]
+            try:
+                entry = future.result()
+            except Exception as e:
+                print(f"❌ {run_id}/{name}: {e.__class__.__name__}: {e}")
+                stats["failed"].append(f"{run_id}/{name}")
+                continue
+
+            stats["downloaded"] += 1
+            stats["bytes"] += entry["size"]
+            elapsed = time.perf_counter() - start
+            print(
+                f"[{stats['downloaded']}/{len(futures)}] {run_id}/{name} "
+                f"({format_size(entry['size'])}, {format_size(stats['bytes'] / elapsed)}/s)"
+            )
+    finally:
+        # when interrupted, queued downloads are dropped and the ones that completed are still recorded
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=True)
+        with lock:
+            for run_id in list(unsaved):
+                save(run_id)
+
+    stats["elapsed_sec"] = time.perf_counter() - start
+    return stats
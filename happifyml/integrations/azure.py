@@ -1,4 +1,8 @@
 import os
+import shutil
+import sys
+import tempfile
+from contextlib import ExitStack, contextmanager
 from multiprocessing.sharedctypes import Value
 from pathlib import Path
 from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
@@ -10,6 +14,147 @@ from azureml.core import Workspace
 from azureml.core.model import Model
 
 from ..utils.credentials import AzureCredentials
+from ..utils.locks import file_lock
+from ..utils.memory import PeakRSSMonitor, format_size
+from ..utils.retry import RemoteCall
+from .artifacts import artifact_id, pull_runs, run_files
+from .export import copy_model_assets, export_model, export_name, export_tags
+from .sharding import (
+    DEFAULT_SHARD_SIZE,
+    WEIGHTS_INDEX_NAME,
+    WEIGHTS_NAME,
+    convert_to_fast_load,
+    init_empty_weights,
+    load_sharded,
+    save_sharded,
+    shard_files,
+)
+from .timeline import SUBMIT_PHASE, Timeline, export_chrome_trace
+
+# Remote call policies. Metadata reads are small and idempotent, so they're hedged when slow.
+# Registrations create a new model version on every call and are only retried if rejected before processing.
+# Workspace() may wait on interactive login and Model.download/Model.register transfer the whole model, so they
+# have no timeout: an abandoned attempt would keep running (a second login prompt, a half or late uploaded version).
+# Nor is a timed out login retried, only a connection that was refused.
+_get_workspace = RemoteCall("Workspace", idempotent=False)
+_get_model = RemoteCall("Model", timeout=60, hedge_after=5)
+_download_model = RemoteCall("Model.download")
+_register_model = RemoteCall("Model.register", idempotent=False)
+_get_run = RemoteCall("workspace.get_run", timeout=60, hedge_after=5)
+_get_run_details = RemoteCall("run.get_details", timeout=60, hedge_after=5)
+_register_run_model = RemoteCall("run.register_model", timeout=900, idempotent=False)
+_get_run_metrics = RemoteCall("run.get_metrics", timeout=60, hedge_after=5)
+_list_models = RemoteCall("Model.list", timeout=120)
+
+# shared local cache of registry models, warmed by `hml models prefetch`.
+# Entries `<name>/<version>` are symlinks to complete content in `<name>/.<version>-*` directories next to them.
+MODEL_CACHE_DIR = os.path.join(os.environ.get("HAPPIFYML_CACHE", os.path.expanduser("~/.happifyml/cache")), "models")
+# marks cached models already converted to memory-mappable shards
+FAST_LOAD_MARKER = ".hml_fast_load"
+
+
+def _print_table(rows: List[Dict], columns: List[str], headers: List[str]) -> None:
+    cells = [headers] + [["" if row.get(column) is None else str(row[column]) for column in columns] for row in rows]
+    widths = [max(len(line[i]) for line in cells) for i in range(len(columns))]
+    for i, line in enumerate(cells):
+        print("  ".join(cell.ljust(width) for cell, width in zip(line, widths)).rstrip())
+        if i == 0:
+            print("  ".join("-" * width for width in widths))
+
+
+def _find_model_dir(path: str) -> str:
+    """
+    Look for the hf model directory (the one holding `pytorch_model.bin` or its shard index) under `path`.
+    """
+    for root, dirs, files in os.walk(path):
+        if WEIGHTS_NAME in files or WEIGHTS_INDEX_NAME in files:
+            return root
+    return path
+
+
+def _link_cache_entry(path: str, target: str) -> None:
+    """
+    Point cache entry `path`, a symlink, at the complete model in `target` with one atomic rename, so readers see
+    either the previous or the new content. Content no longer linked (the previous one and leftovers of interrupted
+    downloads or conversions) is deleted. Requires the entry's exclusive lock.
+    """
+    parent = os.path.dirname(path)
+    link = f"{path}.{os.getpid()}.link"
+    os.symlink(os.path.relpath(target, parent), link)
+    os.replace(link, path)
+
+    linked = os.path.relpath(target, parent).split(os.sep)[0]
+    for name in os.listdir(parent):
+        if name.startswith(f".{os.path.basename(path)}-") and name != linked:
+            shutil.rmtree(os.path.join(parent, name), ignore_errors=True)
+
+
+def download_model(workspace, model_name, version=None, cache_dir=None) -> str:
+    """
+    Path of registered model `model_name:version` (latest if no version) in the shared local cache,
+    downloading it first if missing. A cached pinned version needs no registry call at all.
+    Entries only ever link to complete downloads, an interrupted download is retried on the next call.
+    """
+    cache_dir = cache_dir or MODEL_CACHE_DIR
+    if version is not None and os.path.isdir(os.path.join(cache_dir, model_name, str(version))):
+        return os.path.join(cache_dir, model_name, str(version))
+
+    model = _get_model(Model, workspace, model_name, version=version)
+    path = os.path.join(cache_dir, model_name, str(model.version))
+    if os.path.isdir(path):
+        return path
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with file_lock(path + ".lock"):
+        # another process may have downloaded it while we waited for the lock
+        if not os.path.isdir(path):
+            print(f"Downloading {model_name}:{model.version} from {workspace.name} model registry...")
+            content_dir = tempfile.mkdtemp(prefix=f".{model.version}-", dir=os.path.dirname(path))
+            remote_path = _download_model(model.download, target_dir=content_dir)
+            # link the model directory itself rather than the folder it was downloaded into
+            _link_cache_entry(path, remote_path if os.path.isdir(remote_path) else content_dir)
+
+    return path
+
+
+@contextmanager
+def cached_model(workspace, model_name, version=None, cache_dir=None):
+    """
+    `download_model`, yielding the resolved model directory while holding a shared lock on the cache entry,
+    so a concurrent `hml models prefetch --convert` can't replace the files being loaded.
+    """
+    path = download_model(workspace, model_name, version, cache_dir)
+    with file_lock(path + ".lock", shared=True):
+        yield os.path.realpath(path)
+
+
+def convert_cached_model(path: str, max_shard_size: Union[int, str] = DEFAULT_SHARD_SIZE) -> bool:
+    """
+    Convert cache entry `path` to memory-mappable shards for `from_pretrained(..., low_memory=True)`.
+    The converted copy is built next to the entry and swapped in, readers never see a partial conversion.
+    Returns False if the entry was already converted.
+    """
+    with file_lock(path + ".lock"):
+        source = os.path.realpath(path)
+        if os.path.exists(os.path.join(source, FAST_LOAD_MARKER)):
+            return False
+
+        model_dir = _find_model_dir(source)
+        weight_files = set(shard_files(model_dir)) | {WEIGHTS_INDEX_NAME}
+        target = tempfile.mkdtemp(prefix=f".{os.path.basename(path)}-", dir=os.path.dirname(path))
+
+        # config, tokenizer and any other files are copied as is, only the weights are rewritten
+        shutil.copytree(
+            source,
+            target,
+            dirs_exist_ok=True,
+            ignore=lambda directory, names: weight_files & set(names) if directory == model_dir else [],
+        )
+        convert_to_fast_load(model_dir, os.path.join(target, os.path.relpath(model_dir, source)), max_shard_size)
+        Path(target, FAST_LOAD_MARKER).touch()
+
+        _link_cache_entry(path, target)
+    return True
 
 
 class AzureMixin:
@@ -23,22 +168,71 @@ class AzureMixin:
         **kwargs,
     ):
         """
-        Download and initialize model from azure ml studio
+        Download and initialize model from azure ml studio, registry models are kept in the shared local cache
+        (see `hml models prefetch`)
+
+        With `low_memory=True`, the model is created without allocating weights and checkpoint shards are streamed
+        into it one at a time, so peak memory is about the model size plus one shard instead of twice the model.
+        Config attributes (e.g. `num_labels`) and `torch_dtype` are supported as keyword arguments, other
+        `from_pretrained` arguments raise a `TypeError`.
+        `max_memory` (e.g. "1GB") rejects checkpoints with shard files larger than that, see `save_pretrained`.
+        It doesn't limit the peak memory of loading, which includes the whole model.
         """
-        if workspace and not os.path.isdir(pretrained_model_name_or_path):
-            model = Model(workspace, pretrained_model_name_or_path, version=revision)
-            print(f"Downloading {pretrained_model_name_or_path} from {workspace.name} model registry...")
-            remote_path = model.download()
-            os.rename(remote_path, pretrained_model_name_or_path)
+        low_memory = kwargs.pop("low_memory", False)
+        max_memory = kwargs.pop("max_memory", None)
+
+        with ExitStack() as stack:
+            if workspace and not os.path.isdir(pretrained_model_name_or_path):
+                pretrained_model_name_or_path = stack.enter_context(
+                    cached_model(workspace, pretrained_model_name_or_path, revision)
+                )
+
+            # try to look for hf model directory
+            pretrained_model_name_or_path = _find_model_dir(pretrained_model_name_or_path)
+
+            if low_memory:
+                return cls._from_pretrained_low_memory(
+                    pretrained_model_name_or_path, *model_args, max_memory=max_memory, **kwargs
+                )
+
+            return super(AzureMixin, cls).from_pretrained(pretrained_model_name_or_path, *model_args, **kwargs)
+
+    @classmethod
+    def _from_pretrained_low_memory(cls, pretrained_model_name_or_path, *model_args, max_memory=None, **kwargs):
+        import copy
 
-        # try to look for hf model directory
-        for root, dirs, files in os.walk(pretrained_model_name_or_path):
-            for filename in files:
-                if filename == "pytorch_model.bin":
-                    pretrained_model_name_or_path = root
-                    break
+        from transformers import AutoConfig
 
-        return super(AzureMixin, cls).from_pretrained(pretrained_model_name_or_path, *model_args, **kwargs)
+        if model_args:
+            raise TypeError("low_memory loading doesn't support positional model arguments")
+
+        torch_dtype = kwargs.pop("torch_dtype", None)
+        config = kwargs.pop("config", None)
+        if config is None:
+            # like `from_pretrained`, keyword arguments naming config attributes update the config
+            config, kwargs = AutoConfig.from_pretrained(
+                pretrained_model_name_or_path, return_unused_kwargs=True, **kwargs
+            )
+        else:
+            config = copy.deepcopy(config)
+            config.update({key: kwargs.pop(key) for key in list(kwargs) if hasattr(config, key)})
+        if kwargs:
+            raise TypeError(f"low_memory loading doesn't support {', '.join(sorted(kwargs))}")
+
+        if torch_dtype == "auto":
+            torch_dtype = getattr(config, "torch_dtype", None)
+        if isinstance(torch_dtype, str):
+            torch_dtype = getattr(torch, torch_dtype)
+
+        with PeakRSSMonitor() as monitor:
+            with init_empty_weights():
+                # auto classes build from `from_config`, concrete model classes from their constructor
+                model = cls.from_config(config) if hasattr(cls, "from_config") else cls(config)
+            load_sharded(model, pretrained_model_name_or_path, max_memory=max_memory, dtype=torch_dtype)
+            model.eval()
+
+        print(monitor.report(f"Loaded {pretrained_model_name_or_path}"))
+        return model
 
     def save_pretrained(
         self,
@@ -49,6 +243,11 @@ class AzureMixin:
         workspace: Optional[Workspace] = None,
         push_to_azure: bool = False,
         push_to_hub: bool = False,
+        export: Optional[str] = None,
+        quantize: bool = False,
+        sample_inputs: Optional[Dict[str, torch.Tensor]] = None,
+        low_memory: bool = False,
+        max_memory: Optional[Union[int, str]] = None,
         **kwargs,
     ):
         """
@@ -57,34 +256,85 @@ class AzureMixin:
         2. `push_to_azure only push model folder from `save_pretrained` without other artifacts.
 
         You can set push_to_azure=True, and push_to_hub=True at the same time which will push to 2 places.
+
+        `export="onnx"` or `export="torchscript"` additionally traces the model (dynamic int8 with `quantize=True`)
+        into `<save_directory>-<format>`. With `push_to_azure` it's registered as `<model name>-<format>[-int8]`,
+        tagged with its source model, latency and size. `sample_inputs` defaults to `self.dummy_inputs`.
+
+        `low_memory=True` streams weights to disk in shards of at most `max_memory` (default 1GB)
+        without building a full cpu copy of the state dict.
         """
 
         if push_to_azure and not workspace:
             raise TypeError("push_to_azure requires Azure Workspace object")
 
-        super().save_pretrained(save_directory, save_config, state_dict, save_function, push_to_hub, **kwargs)
+        if low_memory:
+            if push_to_hub or state_dict is not None:
+                raise TypeError("low_memory saving doesn't support push_to_hub or a custom state_dict")
+
+            os.makedirs(save_directory, exist_ok=True)
+            if save_config:
+                self.config.save_pretrained(save_directory)
+            with PeakRSSMonitor() as monitor:
+                save_sharded(self, save_directory, max_shard_size=max_memory or DEFAULT_SHARD_SIZE)
+            print(monitor.report(f"Saved {save_directory}"))
+        else:
+            super().save_pretrained(save_directory, save_config, state_dict, save_function, push_to_hub, **kwargs)
 
         if push_to_azure:
-            AzureMixin.push_to_azure(save_directory, workspace)
+            source = AzureMixin.push_to_azure(save_directory, workspace)
+
+        if export:
+            # same name as the registered export
+            export_dir = export_name(os.fspath(save_directory).rstrip(os.sep), export, quantize)
+            result = export_model(self, sample_inputs or self.dummy_inputs, export_dir, export, quantize)
+            copy_model_assets(save_directory, export_dir)
+            print(f"Exported {export} model to {export_dir} ({result['size_mb']:.1f} MB)")
+
+            if push_to_azure:
+                tags = export_tags(result)
+                tags.update({"source_model": source.name, "source_version": str(source.version)})
+                AzureMixin.push_to_azure(export_dir, workspace, model_name=Path(export_dir).name, tags=tags)
 
     @staticmethod
-    def push_to_azure(model_path, workspace, **kwargs):
-        model_name = Path(model_path).name
+    def push_to_azure(model_path, workspace, model_name=None, **kwargs):
+        if not model_name:
+            model_name = Path(model_path).name
         print(f"Pushing {model_name} to {workspace.name} ... ")
-        Model.register(workspace=workspace, model_path=model_path, model_name=model_name, **kwargs)
+        return _register_model(
+            Model.register, workspace=workspace, model_path=model_path, model_name=model_name, **kwargs
+        )
+
+
+# sample inputs used to trace and validate exported models
+EXPORT_SAMPLE_TEXTS = ["HappifyML export parity check.", "A second, slightly longer sentence to exercise padding."]
 
 
 # TODO(Thomas) to add typing and comments
 class AzureML:
     def __init__(self, subscription_id=None, resource_group=None, workspace_name=None):
         self.credentials = AzureML.login(subscription_id, resource_group, workspace_name)
-        self.workspace = Workspace(**self.credentials)
+        self.workspace = _get_workspace(Workspace, **self.credentials)
 
     @staticmethod
     def login(subscription_id=None, resource_group=None, workspace_name=None, relogin=False):
+        # a fully specified workspace is used as is, e.g. in non-interactive containers
+        if subscription_id and resource_group and workspace_name and not relogin:
+            return {
+                "subscription_id": subscription_id,
+                "resource_group": resource_group,
+                "workspace_name": workspace_name,
+            }
 
         azure_cred = AzureCredentials.get()
         if not azure_cred or relogin:
+            # fail fast rather than hang on a prompt nobody can answer, Jupyter has no tty but can prompt
+            if not sys.stdin.isatty() and "ipykernel" not in sys.modules:
+                raise RuntimeError(
+                    f"No Azure ML workspace credentials in {AzureCredentials.credential_path} and no terminal to "
+                    "ask for them: log in with `hml azure --relogin` first or pass the subscription id, "
+                    "resource group and workspace name"
+                )
             print("Find Azure properties in browser here: https://portal.azure.com/")
             try:
                 subscription_id = questionary.text("subscription_id:").unsafe_ask()
@@ -105,7 +355,7 @@ class AzureML:
 
             # test if credentials are correct
             # TODO(Thomas) to find better approach to test if credentials can successfully login
-            Workspace(**azure_cred)
+            _get_workspace(Workspace, **azure_cred)
 
             # save correct credentials
             AzureCredentials.save(azure_cred)
@@ -133,12 +383,114 @@ class AzureML:
         if not run_id:
             run = Run.get_context()
         else:
-            run = workspace.get_run(run_id)
+            run = _get_run(workspace.get_run, run_id)
 
-        details = run.get_details()
+        details = _get_run_details(run.get_details)
         print(f"Registering model from run: {run.id}, completed on (UTC): {details['endTimeUtc']}")
-        model = run.register_model(model_name=model_name, model_path=model_remote_path)
+        tags = {"run_id": run.id, "artifact_id": artifact_id(run, model_remote_path)}
+        model = _register_run_model(run.register_model, model_name=model_name, model_path=model_remote_path, tags=tags)
         print(model)
+        return model
+
+    def register_models(
+        self,
+        model_name: str,
+        model_remote_path: str,
+        run_ids: Optional[List[str]] = None,
+        experiment_name: Optional[str] = None,
+        metric: Optional[str] = None,
+        top: Optional[int] = None,
+        goal: str = "max",
+        max_workers: int = 8,
+    ) -> List[Dict]:
+        """
+        Register `model_remote_path` of many runs as versions of `model_name`, e.g. the best checkpoints of a sweep.
+
+        Runs are given by `run_ids`, or are the completed runs of `experiment_name` (children included)
+        ranked by the last logged value of `metric` and/or cut to the `top` best, one of which is required so
+        a whole experiment is never registered by accident. Experiment runs without files under
+        `model_remote_path`, like sweep parents, are left out.
+        Run lookups, details and registrations are done concurrently, runs whose model is already registered
+        from the same run and path (same `artifact_id` tag) are skipped.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        from azureml.core import Experiment
+
+        if not run_ids and metric is None and top is None:
+            raise ValueError("Registering runs of an experiment requires a metric to rank them by or a top N")
+
+        with ThreadPoolExecutor(max_workers) as executor:
+            if run_ids:
+                runs = list(executor.map(lambda run_id: _get_run(self.workspace.get_run, run_id), run_ids))
+            else:
+                # `get_runs` pages through run records in batches
+                experiment = Experiment(workspace=self.workspace, name=experiment_name)
+                runs = [run for run in experiment.get_runs(include_children=True) if run.status == "Completed"]
+
+            # the same run listed twice would be registered twice
+            runs = list({run.id: run for run in runs}.values())
+            rows = [{"run": run, "run_id": run.id, "metric": None} for run in runs]
+
+            if metric:
+
+                def last_value(run):
+                    value = _get_run_metrics(run.get_metrics, name=metric).get(metric)
+                    return value[-1] if isinstance(value, list) else value
+
+                for row, value in zip(rows, executor.map(last_value, runs)):
+                    row["metric"] = value
+
+                rows = [row for row in rows if row["metric"] is not None]
+                rows.sort(key=lambda row: row["metric"], reverse=goal == "max")
+
+            def list_files(row):
+                row["files"] = run_files(row["run"], model_remote_path)
+                return row
+
+            if run_ids:
+                rows = list(executor.map(list_files, rows[:top] if top else rows))
+            else:
+                # sweep parents and other runs without `model_remote_path` can't be registered, so the top N are
+                # picked among the runs that have it, listing files a batch at a time in ranking order
+                candidates, rows = rows, []
+                for start in range(0, len(candidates), max_workers):
+                    batch = executor.map(list_files, candidates[start : start + max_workers])
+                    rows.extend(row for row in batch if row["files"])
+                    if top and len(rows) >= top:
+                        break
+                rows = rows[:top] if top else rows
+
+            details = executor.map(lambda row: _get_run_details(row["run"].get_details), rows)
+            for row, detail in zip(rows, details):
+                row["artifact_id"] = artifact_id(row["run"], model_remote_path, row["files"])
+                row["end_time"] = detail.get("endTimeUtc")
+
+            registered = {}
+            for model in _list_models(Model.list, self.workspace, name=model_name):
+                registered.setdefault(model.tags.get("artifact_id"), model.version)
+
+            def register(row):
+                if row["artifact_id"] in registered:
+                    row["status"] = f"skipped, same as version {registered[row['artifact_id']]}"
+                    return
+
+                tags = {"run_id": row["run_id"], "artifact_id": row["artifact_id"]}
+                if metric:
+                    tags[metric] = str(row["metric"])
+                try:
+                    model = _register_run_model(
+                        row["run"].register_model, model_name=model_name, model_path=model_remote_path, tags=tags
+                    )
+                    row["status"] = f"registered version {model.version}"
+                except Exception as e:
+                    row["status"] = f"failed, {e.__class__.__name__}: {e}"
+
+            list(executor.map(register, rows))
+
+        headers = ["run", metric or "metric", "ended (UTC)", "status"]
+        _print_table(rows, ["run_id", "metric", "end_time", "status"], headers)
+        return rows
 
     # def register_model(self, run_id, model_name, model_remote_path) -> None:
     #     run = self.workspace.get_run(run_id)
@@ -146,14 +498,144 @@ class AzureML:
     #     model = run.register_model(model_name=model_name, model_path=model_remote_path)
     #     print(model)
 
+    def export(self, model_name, version=None, export_format="onnx", quantize=False, output_dir=None):
+        """
+        Export a registered hf model, loaded through the shared model cache, to ONNX/TorchScript and register
+        the optimized artifact as `<model_name>-<format>[-int8]`, tagged with its source model, latency and size.
+        The export is written to a temporary directory unless `output_dir` is given.
+        """
+        import transformers
+
+        model = _get_model(Model, self.workspace, model_name, version=version)
+        registered_name = export_name(model_name, export_format, quantize)
+
+        with ExitStack() as stack:
+            # the source comes from (and stays in) the shared model cache, the export only lives until registered
+            source_dir = _find_model_dir(stack.enter_context(cached_model(self.workspace, model_name, model.version)))
+            export_dir = output_dir or os.path.join(
+                stack.enter_context(tempfile.TemporaryDirectory()), registered_name
+            )
+
+            config = transformers.AutoConfig.from_pretrained(source_dir)
+            architecture = getattr(transformers, (config.architectures or ["AutoModel"])[0])
+            torch_model = architecture.from_pretrained(source_dir)
+
+            try:
+                tokenizer = transformers.AutoTokenizer.from_pretrained(source_dir)
+                sample_inputs = dict(tokenizer(EXPORT_SAMPLE_TEXTS, padding=True, return_tensors="pt"))
+            except (OSError, ValueError):
+                sample_inputs = torch_model.dummy_inputs
+
+            result = export_model(torch_model, sample_inputs, export_dir, export_format, quantize)
+            copy_model_assets(source_dir, export_dir)
+
+            tags = export_tags(result)
+            tags.update({"source_model": model_name, "source_version": str(model.version)})
+            registered = AzureMixin.push_to_azure(export_dir, self.workspace, model_name=registered_name, tags=tags)
+
+        print(
+            f"Registered {registered_name}:{registered.version} from {model_name}:{model.version} "
+            f"size: {result['size_mb']:.1f} MB, latency: {result['latency_ms']:.2f} ms, "
+            f"max abs diff: {result['max_abs_diff']:.2e}"
+        )
+        return result
+
+    def pull(self, run_ids, output_dir=".", include=None, exclude=None, max_workers=8):
+        """
+        Download run output files matching `include`/`exclude` globs into `output_dir/<run id>/`,
+        skipping files already pulled.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        def get_run(run_id):
+            try:
+                return _get_run(self.workspace.get_run, run_id)
+            except Exception as e:
+                print(f"❌ {run_id}: {e.__class__.__name__}: {e}")
+                return None
+
+        with ThreadPoolExecutor(max_workers) as executor:
+            runs = list(executor.map(get_run, run_ids))
+
+        # runs that can't be looked up are reported as failed, the others are still pulled
+        missing = [run_id for run_id, run in zip(run_ids, runs) if run is None]
+        stats = pull_runs([run for run in runs if run], output_dir, include, exclude, max_workers=max_workers)
+        stats["runs"] += len(missing)
+        stats["failed"] = missing + stats["failed"]
+        print(
+            f"Pulled {stats['downloaded']} files ({format_size(stats['bytes'])}) from {stats['runs']} runs "
+            f"in {stats['elapsed_sec']:.1f}s ({format_size(stats['bytes'] / stats['elapsed_sec'])}/s), "
+            f"{stats['skipped']} up to date, {len(stats['failed'])} failed"
+        )
+        return stats
+
+    def timeline(self, run_ids, path="timeline.json"):
+        """
+        Export the lifecycle of runs (client phases, status transitions, service start/end) as a Chrome trace.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        def fetch(run_id):
+            run = _get_run(self.workspace.get_run, run_id)
+            return {"run_id": run_id, "details": _get_run_details(run.get_details), "timeline": Timeline.load(run_id)}
+
+        with ThreadPoolExecutor(8) as executor:
+            runs = list(executor.map(fetch, run_ids))
+
+        export_chrome_trace(runs, path)
+        missing = [run["run_id"] for run in runs if not run["timeline"]]
+        if missing:
+            print(f"No client timeline for {', '.join(missing)} (not submitted from this machine), service spans only")
+        print(f"Timeline written to {path}, open it in chrome://tracing or https://ui.perfetto.dev")
+
+    def prefetch(self, models, convert=False, max_workers=4, cache_dir=None):
+        """
+        Download `name[:version]` models into the shared local cache in parallel, optionally converting them to
+        memory-mappable shards for `from_pretrained(..., low_memory=True)`.
+        Returns {model: cached path or the exception raised}.
+        """
+        from concurrent.futures import ThreadPoolExecutor, as_completed
+
+        def fetch(spec):
+            model_name, _, version = spec.partition(":")
+            if version and not version.isdigit():
+                raise ValueError(f"Invalid model '{spec}', expected name[:version]")
+            path = download_model(self.workspace, model_name, int(version) if version else None, cache_dir)
+            if convert:
+                convert_cached_model(path)
+            return path
+
+        results = {}
+        with ThreadPoolExecutor(max_workers) as executor:
+            futures = {executor.submit(fetch, spec): spec for spec in models}
+            for future in as_completed(futures):
+                spec = futures[future]
+                try:
+                    results[spec] = future.result()
+                    print(f"✅ {spec}: {results[spec]}")
+                except Exception as e:
+                    results[spec] = e
+                    print(f"❌ {spec}: {e.__class__.__name__}: {e}")
+        return results
+
     def list_models(self):
         model_dict = self.workspace.models
         for model in model_dict:
             print(model_dict[model].id)
 
-    def submit_training(self, command, experiment_name, base_docker, num_nodes, compute_target=None, **kwargs) -> None:
+    def submit_training(
+        self, command, experiment_name, base_docker, num_nodes, compute_target=None, datasets=None, **kwargs
+    ) -> None:
+        """
+        `datasets` is a list of (name, version, mode) pushed with `hml data push`,
+        the training script reads them with `happifyml.data.resolve(name)`.
+        """
         from azureml.core import Environment, Experiment, ScriptRunConfig
-        from azureml.core.runconfig import DockerConfiguration, MpiConfiguration
+        from azureml.core.runconfig import Data, DockerConfiguration, MpiConfiguration
+
+        from ..data.sync import as_run_input, data_environment_variable
+
+        timeline = Timeline()
 
         if not compute_target:
             available_computes = self.workspace.compute_targets.keys()
@@ -162,9 +644,10 @@ class AzureML:
         # TODO(Thoams) parse environment for:
         # 1. pytorch version
         # 2. base_docker cuda, cudnn version
-        env = Environment.from_conda_specification(experiment_name, "environment.yaml")
-        env.docker.base_image = base_docker
-        env.register(self.workspace)
+        with timeline.phase("Register environment"):
+            env = Environment.from_conda_specification(experiment_name, "environment.yaml")
+            env.docker.base_image = base_docker
+            env.register(self.workspace)
         # docker_config = DockerConfiguration(use_docker=True)
 
         # set environment variables
@@ -176,6 +659,15 @@ class AzureML:
         env.environment_variables["WANDB_API_KEY"] = kwargs.get("hf_cred")
         env.environment_variables["HF_API_KEY"] = kwargs.get("hf_cred")
 
+        inputs = {}
+        if datasets:
+            with timeline.phase("Resolve datasets"):
+                datastore = self.workspace.get_default_datastore()
+                for name, version, mode in datasets:
+                    print(f"Using dataset {name}:{version} ({mode})")
+                    inputs[name] = Data.create(as_run_input(datastore, name, version, mode))
+                    env.environment_variables[data_environment_variable(name)] = str(version)
+
         experiment = Experiment(workspace=self.workspace, name=experiment_name)
 
         # TODO(Thomas) to include `export` to command for multi-node training environmental variables.
@@ -188,6 +680,14 @@ class AzureML:
             distributed_job_config=MpiConfiguration(node_count=num_nodes) if num_nodes > 1 else None,
             # docker_runtime_config=docker_config,
         )
+        config.run_config.data = inputs
+
+        with timeline.phase(SUBMIT_PHASE):
+            run = experiment.submit(config)
 
-        run = experiment.submit(config)
-        run.wait_for_completion(show_output=True)
+        # client phases and observed status transitions feed `hml azure timeline`
+        try:
+            with timeline.phase("Wait for completion"), timeline.watch_status(run):
+                run.wait_for_completion(show_output=True)
+        finally:
+            timeline.save(run.id)
@@ -0,0 +1,196 @@
+import inspect
+import os
+import shutil
+import statistics
+import time
+from typing import Any, Callable, Dict, Optional, Sequence
+
+import torch
+
+EXPORT_FORMATS = ("onnx", "torchscript")
+
+# weight files replaced by the exported artifact, everything else (config, tokenizer) is copied along
+_WEIGHT_FILES = ("pytorch_model", "tf_model", "flax_model", "model.safetensors")
+
+
+class _TracingWrapper(torch.nn.Module):
+    """
+    Feeds positional inputs to the model as keyword arguments and returns the first output tensor,
+    so that models taking dict inputs and returning `ModelOutput` can be traced.
+    """
+
+    def __init__(self, model: torch.nn.Module, input_names: Sequence[str]):
+        super().__init__()
+        self.model = model
+        self.input_names = list(input_names)
+
+    def forward(self, *inputs):
+        outputs = self.model(**dict(zip(self.input_names, inputs)))
+        if isinstance(outputs, torch.Tensor):
+            return outputs
+        if hasattr(outputs, "to_tuple"):
+            outputs = outputs.to_tuple()
+        return outputs[0]
+
+
+def export_model(
+    model: torch.nn.Module,
+    sample_inputs: Dict[str, torch.Tensor],
+    output_dir: str,
+    export_format: str = "onnx",
+    quantize: bool = False,
+    atol: Optional[float] = None,
+    opset: int = 13,
+) -> Dict[str, Any]:
+    """
+    Trace `model` to ONNX or TorchScript for CPU inference, optionally with dynamic int8 quantization.
+
+    The exported artifact is reloaded and checked against the eager model on `sample_inputs`,
+    a `ValueError` is raised if outputs diverge by more than `atol`.
+    Returns export path, parity and latency/size measurements.
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"export_format must be one of {EXPORT_FORMATS}, got '{export_format}'")
+
+    device = next(model.parameters()).device
+    was_training = model.training
+    model.eval().cpu()
+
+    try:
+        input_names = list(sample_inputs)
+        inputs = tuple(sample_inputs[name].cpu() for name in input_names)
+        wrapper = _TracingWrapper(model, input_names).eval()
+
+        with torch.no_grad():
+            reference = wrapper(*inputs)
+
+        os.makedirs(output_dir, exist_ok=True)
+        if export_format == "torchscript":
+            path = _export_torchscript(wrapper, inputs, output_dir, quantize)
+            scripted = torch.jit.load(path)
+
+            def run():
+                with torch.no_grad():
+                    return scripted(*inputs)
+
+        else:
+            import onnxruntime
+
+            path = _export_onnx(wrapper, inputs, input_names, output_dir, quantize, opset)
+            session = onnxruntime.InferenceSession(path, providers=["CPUExecutionProvider"])
+            feed = {name: tensor.numpy() for name, tensor in zip(input_names, inputs)}
+
+            def run():
+                return torch.from_numpy(session.run(None, feed)[0])
+
+        max_abs_diff = (run().float() - reference.float()).abs().max().item()
+        if atol is None:
+            # dynamic int8 only needs to stay close relative to the output scale
+            atol = (5e-2 if quantize else 1e-4) * max(1.0, reference.abs().max().item())
+        if max_abs_diff > atol:
+            raise ValueError(
+                f"Exported {export_format} model diverges from PyTorch: max abs diff {max_abs_diff:.2e} > {atol:.2e}"
+            )
+
+        latencies = measure_latency(run)
+    finally:
+        model.train(was_training).to(device)
+
+    return {
+        "path": path,
+        "format": export_format,
+        "quantized": quantize,
+        "max_abs_diff": max_abs_diff,
+        "latency_ms": statistics.median(latencies),
+        "latency_p90_ms": sorted(latencies)[int(0.9 * (len(latencies) - 1))],
+        "size_mb": os.path.getsize(path) / 2**20,
+    }
+
+
+def _export_torchscript(wrapper, inputs, output_dir, quantize) -> str:
+    if quantize:
+        wrapper = torch.quantization.quantize_dynamic(wrapper, {torch.nn.Linear}, dtype=torch.qint8)
+
+    path = os.path.join(output_dir, "model.int8.pt" if quantize else "model.pt")
+    with torch.no_grad():
+        traced = torch.jit.trace(wrapper, inputs, strict=False)
+    traced.save(path)
+    return path
+
+
+def _export_onnx(wrapper, inputs, input_names, output_dir, quantize, opset) -> str:
+    path = os.path.join(output_dir, "model.onnx")
+
+    # keep batch and sequence length dynamic so one artifact serves any request shape
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name, x in zip(input_names, inputs) if x.dim() > 1}
+    dynamic_axes["output"] = {0: "batch"}
+
+    with torch.no_grad():
+        torch.onnx.export(
+            wrapper,
+            inputs,
+            path,
+            input_names=input_names,
+            output_names=["output"],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset,
+            # newer torch defaults to the dynamo exporter, which can't take `dynamic_axes` of a varargs module
+            **({"dynamo": False} if "dynamo" in inspect.signature(torch.onnx.export).parameters else {}),
+        )
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        quantized_path = os.path.join(output_dir, "model.int8.onnx")
+        quantize_dynamic(path, quantized_path, weight_type=QuantType.QInt8)
+        os.remove(path)
+        path = quantized_path
+
+    return path
+
+
+def measure_latency(fn: Callable, warmup: int = 3, iterations: int = 20) -> list:
+    """
+    Wall-clock latencies of `fn` in milliseconds, after `warmup` untimed calls.
+    """
+    for _ in range(warmup):
+        fn()
+
+    latencies = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def copy_model_assets(source_dir: str, export_dir: str) -> None:
+    """
+    Copy config and tokenizer files next to the exported artifact, skipping the original weights.
+    """
+    for filename in os.listdir(source_dir):
+        source = os.path.join(source_dir, filename)
+        if os.path.isfile(source) and not filename.startswith(_WEIGHT_FILES):
+            shutil.copy2(source, os.path.join(export_dir, filename))
+
+
+def export_name(model_name: str, export_format: str, quantize: bool = False) -> str:
+    """
+    Registry name of an export, e.g. `intent-classifier-onnx-int8`. Exports are registered apart from their source
+    model, so resolving the latest version of the source always gets hf weights.
+    """
+    return f"{model_name}-{export_format}{'-int8' if quantize else ''}"
+
+
+def export_tags(result: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Model registry tags describing an export, used by deployment to pick the fastest variant.
+    """
+    return {
+        "format": result["format"],
+        "quantization": "dynamic-int8" if result["quantized"] else "none",
+        "latency_ms": f"{result['latency_ms']:.3f}",
+        "latency_p90_ms": f"{result['latency_p90_ms']:.3f}",
+        "size_mb": f"{result['size_mb']:.2f}",
+        "parity_max_abs_diff": f"{result['max_abs_diff']:.2e}",
+    }
@@ -0,0 +1,218 @@
+import json
+import os
+import pickle
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Union
+
+import torch
+
+from ..utils.memory import format_size, parse_size
+
+# same names as hf transformers, so sharded checkpoints stay loadable with plain `from_pretrained`
+WEIGHTS_NAME = "pytorch_model.bin"
+WEIGHTS_INDEX_NAME = "pytorch_model.bin.index.json"
+DEFAULT_SHARD_SIZE = "1GB"
+
+
+@contextmanager
+def init_empty_weights():
+    """
+    Create parameters on the meta device while models are constructed inside this context.
+    Nothing is allocated for weights, buffers (e.g. position ids) stay real since checkpoints may not hold them.
+    """
+    register_parameter = torch.nn.Module.register_parameter
+
+    def register_empty_parameter(module, name, param):
+        register_parameter(module, name, param)
+        if param is not None:
+            module._parameters[name] = torch.nn.Parameter(param.to("meta"), requires_grad=param.requires_grad)
+
+    torch.nn.Module.register_parameter = register_empty_parameter
+    try:
+        yield
+    finally:
+        torch.nn.Module.register_parameter = register_parameter
+
+
+def save_sharded(
+    model: torch.nn.Module, save_directory: str, max_shard_size: Union[int, str] = DEFAULT_SHARD_SIZE
+) -> List[str]:
+    """
+    Save weights shard by shard, only one shard is ever copied to cpu memory.
+    Tied weights are saved once. Returns the written shard files.
+    """
+    # `state_dict()` only holds references to the parameters, no copy is made
+    return save_state_dict_sharded(model.state_dict(), save_directory, max_shard_size)
+
+
+def save_state_dict_sharded(
+    state_dict: Dict[str, torch.Tensor], save_directory: str, max_shard_size: Union[int, str] = DEFAULT_SHARD_SIZE
+) -> List[str]:
+    max_shard_size = parse_size(max_shard_size)
+    os.makedirs(save_directory, exist_ok=True)
+
+    shard_files = []
+    weight_map = {}
+    total_size = 0
+    shard, shard_size = {}, 0
+    saved_storages = set()
+
+    def flush(shard):
+        filename = f"pytorch_model-{len(shard_files) + 1:05d}.bin"
+        torch.save(shard, os.path.join(save_directory, filename))
+        shard_files.append(filename)
+        for name in shard:
+            weight_map[name] = filename
+
+    for name, tensor in state_dict.items():
+        # empty tensors all have a null data pointer, they're never tied
+        if tensor.numel():
+            storage = (tensor.device, tensor.data_ptr(), tensor.shape)
+            if storage in saved_storages:
+                continue
+            saved_storages.add(storage)
+
+        num_bytes = tensor.numel() * tensor.element_size()
+        if shard and shard_size + num_bytes > max_shard_size:
+            flush(shard)
+            shard, shard_size = {}, 0
+
+        # clone so a shard never pins the storage of a larger tensor it's a view of
+        shard[name] = tensor.detach().to("cpu", copy=True)
+        shard_size += num_bytes
+        total_size += num_bytes
+
+    if shard or not shard_files:
+        flush(shard)
+    del shard
+
+    if len(shard_files) == 1:
+        os.replace(os.path.join(save_directory, shard_files[0]), os.path.join(save_directory, WEIGHTS_NAME))
+        return [WEIGHTS_NAME]
+
+    renamed = {}
+    for i, filename in enumerate(shard_files):
+        renamed[filename] = f"pytorch_model-{i + 1:05d}-of-{len(shard_files):05d}.bin"
+        os.replace(os.path.join(save_directory, filename), os.path.join(save_directory, renamed[filename]))
+
+    index = {
+        "metadata": {"total_size": total_size},
+        "weight_map": {name: renamed[filename] for name, filename in weight_map.items()},
+    }
+    with open(os.path.join(save_directory, WEIGHTS_INDEX_NAME), "w") as f:
+        json.dump(index, f, indent=2, sort_keys=True)
+
+    return list(renamed.values())
+
+
+def shard_files(directory: str) -> List[str]:
+    index_path = os.path.join(directory, WEIGHTS_INDEX_NAME)
+    if os.path.exists(index_path):
+        with open(index_path) as f:
+            return sorted(set(json.load(f)["weight_map"].values()))
+    return [WEIGHTS_NAME]
+
+
+def convert_to_fast_load(
+    directory: str, output_dir: str, max_shard_size: Union[int, str] = DEFAULT_SHARD_SIZE
+) -> List[str]:
+    """
+    Write the weights in `directory` to `output_dir` as zipfile-format shards of at most `max_shard_size`,
+    which `load_sharded` memory-maps and streams. Meant to run ahead of time (e.g. on model prefetch),
+    it holds one full copy of the original weights while converting. `directory` is left untouched.
+    """
+    state_dict = {}
+    for filename in shard_files(directory):
+        state_dict.update(_load_shard(os.path.join(directory, filename)))
+
+    return save_state_dict_sharded(state_dict, output_dir, max_shard_size)
+
+
+def _load_shard(path: str) -> Dict[str, torch.Tensor]:
+    try:
+        # memory-mapped, pages are read lazily and never duplicated in anonymous memory
+        return torch.load(path, map_location="cpu", mmap=True, weights_only=True)
+    except (TypeError, RuntimeError, pickle.UnpicklingError):
+        # older torch or legacy (non-zipfile) checkpoints
+        return torch.load(path, map_location="cpu")
+
+
+def _resolve_name(name: str, names: set, prefix: str) -> Optional[str]:
+    # checkpoints of a base model loaded into a model with a head, and the other way around
+    for candidate in (name, f"{prefix}.{name}", name[len(prefix) + 1 :] if name.startswith(prefix + ".") else None):
+        if candidate in names:
+            return candidate
+    return None
+
+
+def _set_tensor(
+    model: torch.nn.Module,
+    name: str,
+    tensor: torch.Tensor,
+    device: Union[str, torch.device],
+    dtype: Optional[torch.dtype] = None,
+) -> None:
+    module_name, _, attr = name.rpartition(".")
+    module = model.get_submodule(module_name)
+
+    if attr in module._parameters:
+        old = module._parameters[attr]
+        if not tensor.is_floating_point():
+            dtype = tensor.dtype
+        elif dtype is None:
+            dtype = tensor.dtype if old.is_meta or not old.is_floating_point() else old.dtype
+        module._parameters[attr] = torch.nn.Parameter(
+            tensor.to(device=device, dtype=dtype), requires_grad=old.requires_grad
+        )
+    else:
+        module._buffers[attr] = tensor.to(device)
+
+
+def load_sharded(
+    model: torch.nn.Module,
+    directory: str,
+    max_memory: Optional[Union[int, str]] = None,
+    device: Union[str, torch.device] = "cpu",
+    dtype: Optional[torch.dtype] = None,
+) -> torch.nn.Module:
+    """
+    Stream weights from `directory` into `model` one shard at a time, floating point parameters are cast to `dtype`
+    as they're loaded if given.
+
+    `model` should be created under `init_empty_weights()` so no memory is spent on its random initialization.
+    With `max_memory`, every shard file must fit in the budget, re-save with `save_sharded` to get smaller shards.
+    It's only a check of shard file sizes, the loaded model itself still takes its full size on top.
+    """
+    files = shard_files(directory)
+
+    if max_memory is not None:
+        budget = parse_size(max_memory)
+        for filename in files:
+            size = os.path.getsize(os.path.join(directory, filename))
+            if size > budget:
+                raise MemoryError(
+                    f"{filename} ({format_size(size)}) exceeds memory budget of {format_size(budget)}, "
+                    f"re-save the model with a smaller shard size"
+                )
+
+    names = {name for name, _ in model.named_parameters()} | {name for name, _ in model.named_buffers()}
+    prefix = getattr(model, "base_model_prefix", "")
+
+    for filename in files:
+        shard = _load_shard(os.path.join(directory, filename))
+        for name in list(shard):
+            target = _resolve_name(name, names, prefix)
+            tensor = shard.pop(name)
+            if target is not None:
+                _set_tensor(model, target, tensor, device, dtype)
+            del tensor
+        del shard
+
+    if hasattr(model, "tie_weights"):
+        model.tie_weights()
+
+    missing = [name for name, param in model.named_parameters() if param.is_meta]
+    if missing:
+        raise ValueError(f"Weights missing from {directory}: {', '.join(missing[:10])}")
+
+    return model
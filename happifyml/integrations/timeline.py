@@ -0,0 +1,174 @@
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+TIMELINE_DIR = os.path.expanduser("~/.happifyml/timelines/")
+
+# Azure ML run statuses and what the job is doing while in them
+STATUS_PHASES = {
+    "NotStarted": "Not started",
+    "Queued": "Queued (waiting for compute)",
+    "Preparing": "Preparing (environment image build)",
+    "Provisioning": "Provisioning (node allocation)",
+    "Starting": "Starting (node preparation, snapshot download)",
+    "Running": "Running (user code)",
+    "Finalizing": "Finalizing (output upload)",
+}
+TERMINAL_STATUSES = ("Completed", "Failed", "Canceled")
+
+CLIENT_TID, STATUS_TID, SERVICE_TID = 1, 2, 3
+
+# client phase ending once the run exists on the service
+SUBMIT_PHASE = "Submit (source snapshot upload)"
+
+
+def parse_utc(value: Optional[str]) -> Optional[float]:
+    """
+    Parse Azure ML UTC timestamps (e.g. `2021-06-02T18:20:42.1234567Z`) to epoch seconds.
+    """
+    if not value:
+        return None
+    # before 3.11, python only parses fractions of exactly 3 or 6 digits and no "Z" suffix
+    value = re.sub(r"\.(\d+)", lambda m: "." + m.group(1)[:6].ljust(6, "0"), value.replace("Z", "+00:00"))
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+class Timeline:
+    """
+    Client-side phases of a submission and the run status transitions observed while waiting for it,
+    saved under `~/.happifyml/timelines/<run id>.json` for `hml azure timeline`.
+    """
+
+    def __init__(self, phases: Optional[List[Dict]] = None, statuses: Optional[List[Dict]] = None):
+        self.phases = phases or []
+        self.statuses = statuses or []
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.phases.append({"name": name, "start": start, "end": time.time()})
+
+    @contextmanager
+    def watch_status(self, run, interval: float = 5.0):
+        """
+        Poll `run.get_status()` in the background and record every transition.
+        """
+        stop = threading.Event()
+
+        def poll():
+            while True:
+                try:
+                    status = run.get_status()
+                except Exception:
+                    status = None
+                if status and (not self.statuses or self.statuses[-1]["status"] != status):
+                    self.statuses.append({"status": status, "time": time.time()})
+                if status in TERMINAL_STATUSES or stop.wait(interval):
+                    return
+
+        thread = threading.Thread(target=poll, daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join(timeout=interval + 60)
+
+    @staticmethod
+    def path(run_id: str) -> str:
+        return os.path.join(TIMELINE_DIR, f"{run_id}.json")
+
+    def save(self, run_id: str) -> None:
+        os.makedirs(TIMELINE_DIR, exist_ok=True)
+        with open(Timeline.path(run_id), "w") as f:
+            json.dump({"phases": self.phases, "statuses": self.statuses}, f, indent=2)
+
+    @classmethod
+    def load(cls, run_id: str) -> Optional["Timeline"]:
+        try:
+            with open(Timeline.path(run_id)) as f:
+                return cls(**json.load(f))
+        except FileNotFoundError:
+            return None
+
+
+def _event(name: str, start: float, end: float, pid: int, tid: int, **args) -> Dict:
+    return {
+        "name": name,
+        "ph": "X",
+        "ts": start * 1e6,
+        "dur": max(0.0, end - start) * 1e6,
+        "pid": pid,
+        "tid": tid,
+        "args": args,
+    }
+
+
+def _metadata(name: str, pid: int, tid: Optional[int], value: str) -> Dict:
+    event = {"name": name, "ph": "M", "pid": pid, "args": {"name": value}}
+    if tid is not None:
+        event["tid"] = tid
+    return event
+
+
+def run_trace_events(pid: int, run_id: str, details: Dict, timeline: Optional[Timeline] = None) -> List[Dict]:
+    """
+    Chrome trace events for one run: client phases, observed status transitions and the service-side
+    queued/running spans from `run.get_details()`. Each run is one process, so runs can be compared side by side.
+    """
+    status = details.get("status", "")
+    events = [
+        _metadata("process_name", pid, None, f"{run_id} ({status})" if status else run_id),
+        _metadata("thread_name", pid, CLIENT_TID, "client"),
+        _metadata("thread_name", pid, STATUS_TID, "run status"),
+        _metadata("thread_name", pid, SERVICE_TID, "service"),
+    ]
+
+    start = parse_utc(details.get("startTimeUtc"))
+    end = parse_utc(details.get("endTimeUtc")) or time.time()
+
+    if timeline:
+        for phase in timeline.phases:
+            events.append(_event(phase["name"], phase["start"], phase["end"], pid, CLIENT_TID))
+
+        transitions = timeline.statuses
+        for current, following in zip(transitions, transitions[1:] + [None]):
+            if current["status"] in TERMINAL_STATUSES:
+                continue
+            name = STATUS_PHASES.get(current["status"], current["status"])
+            events.append(_event(name, current["time"], following["time"] if following else end, pid, STATUS_TID))
+
+    # without a client timeline, the service only tells when the run started and ended
+    submitted = None
+    if timeline:
+        submitted = next((phase["end"] for phase in timeline.phases if phase["name"] == SUBMIT_PHASE), None)
+    if submitted and start:
+        events.append(_event("Waiting (queue, image build, node preparation)", submitted, start, pid, SERVICE_TID))
+    if start:
+        events.append(_event("Run on compute", start, end, pid, SERVICE_TID, target=details.get("target")))
+
+    return events
+
+
+def export_chrome_trace(runs: List[Dict], path: str) -> None:
+    """
+    Write a Chrome/Perfetto trace of `runs`, dicts with `run_id`, `details` and an optional `timeline`.
+    Open it in chrome://tracing or https://ui.perfetto.dev.
+    """
+    events = []
+    for pid, run in enumerate(runs, start=1):
+        events.extend(run_trace_events(pid, run["run_id"], run["details"], run.get("timeline")))
+
+    with open(path, "w") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
@@ -0,0 +1,92 @@
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+import torch
+
+
+class ThroughputLogger:
+    """
+    Log average step time and samples/sec every `log_every` optimizer steps.
+    """
+
+    def __init__(self, log_every: int = 50, enabled: bool = True):
+        self.log_every = log_every
+        self.enabled = enabled
+        self.steps = 0
+        self.samples = 0
+        self.start = time.perf_counter()
+
+    def step(self, num_samples: int, loss: Optional[torch.Tensor] = None) -> Optional[Dict[str, float]]:
+        """
+        Call once per optimizer step. `loss` is only read (forcing a device sync) on logging steps.
+        """
+        self.steps += 1
+        self.samples += num_samples
+        if self.steps % self.log_every:
+            return None
+
+        if torch.cuda.is_available():
+            # kernels run asynchronously, wait for them so the timing is real
+            torch.cuda.synchronize()
+        elapsed = time.perf_counter() - self.start
+        stats = {
+            "step_time_ms": elapsed / self.log_every * 1000,
+            "samples_per_sec": self.samples / elapsed,
+        }
+        if self.enabled:
+            loss_text = f", loss {float(loss):.4f}" if loss is not None else ""
+            print(
+                f"step {self.steps}: {stats['step_time_ms']:.1f} ms/step, "
+                f"{stats['samples_per_sec']:.1f} samples/s{loss_text}"
+            )
+
+        self.samples = 0
+        self.start = time.perf_counter()
+        return stats
+
+
+class AsyncCheckpointer:
+    """
+    Save checkpoints in a background thread so training doesn't wait on disk.
+    The state is copied to CPU first, at most one save is in flight.
+    """
+
+    def __init__(self, output_dir: str, enabled: bool = True):
+        self.output_dir = output_dir
+        self.enabled = enabled
+        self._thread: Optional[threading.Thread] = None
+        if enabled:
+            os.makedirs(output_dir, exist_ok=True)
+
+    def save(self, state: Dict, name: str) -> None:
+        if not self.enabled:
+            return
+        self.wait()
+
+        cpu_state = _to_cpu(state)
+        path = os.path.join(self.output_dir, name)
+
+        def write():
+            tmp_path = path + ".tmp"
+            torch.save(cpu_state, tmp_path)
+            os.replace(tmp_path, path)
+
+        self._thread = threading.Thread(target=write)
+        self._thread.start()
+
+    def wait(self) -> None:
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+def _to_cpu(state):
+    if isinstance(state, torch.Tensor):
+        return state.detach().to("cpu", copy=True)
+    if isinstance(state, dict):
+        return {key: _to_cpu(value) for key, value in state.items()}
+    if isinstance(state, (list, tuple)):
+        return type(state)(_to_cpu(value) for value in state)
+    return state
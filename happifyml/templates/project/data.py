@@ -0,0 +1,49 @@
+import os
+
+import torch
+from torch.utils.data import DataLoader, Dataset, DistributedSampler
+
+
+class RandomDataset(Dataset):
+    def __init__(self, size: int = 1024, input_size: int = 32, num_classes: int = 2):
+        generator = torch.Generator().manual_seed(0)
+        self.inputs = torch.randn(size, input_size, generator=generator)
+        self.labels = torch.randint(num_classes, (size,), generator=generator)
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def __getitem__(self, index: int):
+        return self.inputs[index], self.labels[index]
+
+
+def default_num_workers() -> int:
+    # CPUs this process may use, shared by every rank on the node
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1
+    local_world_size = int(os.environ.get("OMPI_COMM_WORLD_LOCAL_SIZE", os.environ.get("LOCAL_WORLD_SIZE", 1)))
+    return max(0, min(8, cpus // local_world_size - 1))
+
+
+def build_dataloader(
+    dataset: Dataset,
+    batch_size: int,
+    shuffle: bool = True,
+    num_workers: int = None,
+    prefetch_factor: int = 4,
+    distributed: bool = False,
+) -> DataLoader:
+    num_workers = default_num_workers() if num_workers is None else num_workers
+    sampler = DistributedSampler(dataset, shuffle=shuffle) if distributed else None
+
+    return DataLoader(
+        dataset,
+        batch_size=batch_size,
+        shuffle=shuffle and sampler is None,
+        sampler=sampler,
+        num_workers=num_workers,
+        # page-locked host memory makes host to GPU copies asynchronous
+        pin_memory=torch.cuda.is_available(),
+        prefetch_factor=prefetch_factor if num_workers > 0 else None,
+        persistent_workers=num_workers > 0,
+        drop_last=True,
+    )
@@ -0,0 +1,14 @@
+import torch
+
+
+class Model(torch.nn.Module):
+    def __init__(self, input_size: int = 32, hidden_size: int = 64, num_classes: int = 2):
+        super().__init__()
+        self.layers = torch.nn.Sequential(
+            torch.nn.Linear(input_size, hidden_size),
+            torch.nn.ReLU(),
+            torch.nn.Linear(hidden_size, num_classes),
+        )
+
+    def forward(self, inputs: torch.Tensor) -> torch.Tensor:
+        return self.layers(inputs)
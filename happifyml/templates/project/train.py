@@ -0,0 +1,128 @@
+import argparse
+import os
+from contextlib import nullcontext
+
+import torch
+import torch.distributed as dist
+
+from callbacks import AsyncCheckpointer, ThroughputLogger
+from data import RandomDataset, build_dataloader
+from happifyml.utils import set_az_pl_environment_variables
+from model import Model
+
+
+def get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument("--epochs", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=64, help="per device batch size")
+    parser.add_argument("--lr", type=float, default=1e-3)
+    parser.add_argument("--accumulate", type=int, default=1, help="gradient accumulation steps")
+    parser.add_argument(
+        "--precision", type=str, default=None, choices=["32", "16", "bf16"], help="defaults to 16 on GPU, 32 on CPU"
+    )
+    parser.add_argument("--num-workers", type=int, default=None, help="DataLoader workers, defaults from CPU count")
+    parser.add_argument("--log-every", type=int, default=50, help="log throughput every N optimizer steps")
+    parser.add_argument("--checkpoint-every", type=int, default=500, help="checkpoint every N optimizer steps")
+    parser.add_argument("--output-dir", type=str, default="outputs")
+    parser.add_argument("--nodes", type=int, default=1, help="number of nodes, used by `hml azure`")
+    return parser
+
+
+def setup_distributed() -> bool:
+    # Azure ML MPI jobs: multi-node jobs expose AZ_BATCH_MASTER_NODE, single-node ones AZ_BATCHAI_MPI_MASTER_NODE
+    if "AZ_BATCH_MASTER_NODE" in os.environ:
+        set_az_pl_environment_variables(single_node=False)
+    elif "AZ_BATCHAI_MPI_MASTER_NODE" in os.environ:
+        set_az_pl_environment_variables(single_node=True)
+
+    if int(os.environ.get("WORLD_SIZE", 1)) <= 1:
+        return False
+
+    os.environ.setdefault("RANK", os.environ.get("OMPI_COMM_WORLD_RANK", "0"))
+    dist.init_process_group("nccl" if torch.cuda.is_available() else "gloo")
+    if torch.cuda.is_available():
+        torch.cuda.set_device(int(os.environ.get("LOCAL_RANK", 0)))
+    return True
+
+
+def autocast(device: torch.device, precision: str):
+    if precision == "16":
+        return torch.autocast(device.type, dtype=torch.float16)
+    if precision == "bf16":
+        return torch.autocast(device.type, dtype=torch.bfloat16)
+    return nullcontext()
+
+
+def main(args: argparse.Namespace) -> None:
+    distributed = setup_distributed()
+    is_main = not distributed or dist.get_rank() == 0
+    device = torch.device("cuda", torch.cuda.current_device()) if torch.cuda.is_available() else torch.device("cpu")
+    precision = args.precision or ("16" if device.type == "cuda" else "32")
+
+    # let cuDNN pick the fastest kernels for fixed input shapes
+    torch.backends.cudnn.benchmark = True
+
+    loader = build_dataloader(RandomDataset(), args.batch_size, num_workers=args.num_workers, distributed=distributed)
+    model = Model().to(device)
+    if distributed:
+        device_ids = [device.index] if device.type == "cuda" else None
+        model = torch.nn.parallel.DistributedDataParallel(model, device_ids=device_ids)
+
+    optimizer = torch.optim.AdamW(model.parameters(), lr=args.lr)
+    # loss scaling keeps fp16 gradients from underflowing, bf16 doesn't need it
+    use_scaler = precision == "16" and device.type == "cuda"
+    if hasattr(torch.amp, "GradScaler"):
+        scaler = torch.amp.GradScaler("cuda", enabled=use_scaler)
+    else:
+        scaler = torch.cuda.amp.GradScaler(enabled=use_scaler)
+    loss_fn = torch.nn.CrossEntropyLoss()
+
+    logger = ThroughputLogger(args.log_every, enabled=is_main)
+    checkpointer = AsyncCheckpointer(args.output_dir, enabled=is_main)
+
+    step = 0
+    for epoch in range(args.epochs):
+        model.train()
+        if distributed:
+            loader.sampler.set_epoch(epoch)
+
+        for i, (inputs, labels) in enumerate(loader):
+            inputs = inputs.to(device, non_blocking=True)
+            labels = labels.to(device, non_blocking=True)
+            # the last window of an epoch may be shorter, step on it rather than carry its gradients over
+            window = min(args.accumulate, len(loader) - i // args.accumulate * args.accumulate)
+            boundary = (i + 1) % args.accumulate == 0 or i + 1 == len(loader)
+
+            # skip the gradient all-reduce on accumulation steps
+            sync = nullcontext() if boundary or not distributed else model.no_sync()
+            with sync:
+                with autocast(device, precision):
+                    loss = loss_fn(model(inputs), labels) / window
+                scaler.scale(loss).backward()
+
+            if not boundary:
+                continue
+
+            scaler.step(optimizer)
+            scaler.update()
+            optimizer.zero_grad(set_to_none=True)
+            step += 1
+
+            logger.step(inputs.size(0) * window, loss.detach() * window)
+            if step % args.checkpoint_every == 0:
+                checkpointer.save(_state(model, optimizer, epoch, step), f"step-{step}.pt")
+
+        checkpointer.save(_state(model, optimizer, epoch, step), "last.pt")
+
+    checkpointer.wait()
+    if distributed:
+        dist.destroy_process_group()
+
+
+def _state(model, optimizer, epoch, step):
+    model = model.module if hasattr(model, "module") else model
+    return {"model": model.state_dict(), "optimizer": optimizer.state_dict(), "epoch": epoch, "step": step}
+
+
+if __name__ == "__main__":
+    main(get_parser().parse_args())
@@ -1,3 +1,6 @@
 from .cli import *
 from .credentials import AzureCredentials, HfCredentials, WandbCredentials
 from .environments import set_az_pl_environment_variables
+from .locks import file_lock
+from .memory import PeakRSSMonitor, format_size, parse_size
+from .retry import CallStats, CallTimeoutError, RemoteCall, call_stats
@@ -0,0 +1,15 @@
+import fcntl
+from contextlib import contextmanager
+
+
+@contextmanager
+def file_lock(path: str, shared: bool = False):
+    """
+    Advisory lock on `path` (created if missing) shared by every process of the node, exclusive unless `shared`.
+    """
+    with open(path, "a+") as f:
+        fcntl.flock(f, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
@@ -0,0 +1,80 @@
+import re
+import threading
+from typing import Optional, Union
+
+import psutil
+
+_SIZE_UNITS = {
+    "": 1,
+    "B": 1,
+    "KB": 1_000,
+    "MB": 1_000_000,
+    "GB": 1_000_000_000,
+    "KIB": 1 << 10,
+    "MIB": 1 << 20,
+    "GIB": 1 << 30,
+}
+
+
+def parse_size(size: Union[int, str]) -> int:
+    """
+    Parse a memory size such as `2GB`, `500MiB` or a number of bytes.
+    """
+    if isinstance(size, int):
+        return size
+
+    match = re.fullmatch(r"\s*([\d.]+)\s*([a-zA-Z]*)\s*", size)
+    if not match or match.group(2).upper() not in _SIZE_UNITS:
+        raise ValueError(f"Invalid memory size '{size}', expected e.g. '2GB' or '500MiB'")
+    return int(float(match.group(1)) * _SIZE_UNITS[match.group(2).upper()])
+
+
+def format_size(num_bytes: int) -> str:
+    for unit in ["B", "KB", "MB", "GB"]:
+        if abs(num_bytes) < 1000:
+            return f"{num_bytes:.1f} {unit}"
+        num_bytes /= 1000
+    return f"{num_bytes:.1f} TB"
+
+
+class PeakRSSMonitor:
+    """
+    Sample the resident set size of the current process in a background thread and keep the peak.
+
+    Usage:
+        with PeakRSSMonitor() as monitor:
+            ...
+        print(format_size(monitor.peak - monitor.start))
+    """
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.process = psutil.Process()
+        self.start: Optional[int] = None
+        self.peak: Optional[int] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def sample(self) -> int:
+        rss = self.process.memory_info().rss
+        self.peak = max(self.peak or 0, rss)
+        return rss
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def __enter__(self) -> "PeakRSSMonitor":
+        self.start = self.sample()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+        self.sample()
+
+    def report(self, action: str) -> str:
+        return f"{action}: peak RSS {format_size(self.peak)} (+{format_size(self.peak - self.start)})"
@@ -0,0 +1,210 @@
+import logging
+import random
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# transient server side failures, safe to retry for idempotent calls
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+# the request was rejected before being processed, safe to retry even for non-idempotent calls
+REJECTED_STATUS = {429, 503}
+
+
+class CallTimeoutError(TimeoutError):
+    pass
+
+
+class CallStats:
+    """
+    Thread-safe per-operation counters and latency samples of remote calls.
+    """
+
+    def __init__(self, max_samples: int = 1000):
+        self._lock = threading.Lock()
+        self._counters = defaultdict(lambda: defaultdict(int))
+        self._latencies = defaultdict(lambda: deque(maxlen=max_samples))
+
+    def increment(self, operation: str, counter: str) -> None:
+        with self._lock:
+            self._counters[operation][counter] += 1
+
+    def record_latency(self, operation: str, seconds: float) -> None:
+        with self._lock:
+            self._latencies[operation].append(seconds)
+
+    def percentile(self, operation: str, q: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._latencies[operation])
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(q / 100 * len(samples)))]
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            operations = list(self._counters)
+            summary = {operation: dict(self._counters[operation]) for operation in operations}
+        for operation in operations:
+            summary[operation]["p50_ms"] = _to_ms(self.percentile(operation, 50))
+            summary[operation]["p99_ms"] = _to_ms(self.percentile(operation, 99))
+        return summary
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._latencies.clear()
+
+
+def _to_ms(seconds: Optional[float]) -> Optional[float]:
+    return None if seconds is None else seconds * 1000
+
+
+# process wide stats, shared by every `RemoteCall` unless given its own
+call_stats = CallStats()
+
+
+def status_code(exc: BaseException) -> Optional[int]:
+    """
+    HTTP status of an exception raised by azure/requests clients, if any.
+    """
+    code = getattr(exc, "status_code", None)
+    if code is None:
+        code = getattr(getattr(exc, "response", None), "status_code", None)
+    return code if isinstance(code, int) else None
+
+
+def is_retryable(exc: BaseException, idempotent: bool = True) -> bool:
+    if isinstance(exc, CallTimeoutError):
+        # a timed out request may still land on the server
+        return idempotent
+
+    code = status_code(exc)
+    if code is not None:
+        return code in (RETRYABLE_STATUS if idempotent else REJECTED_STATUS)
+
+    if isinstance(exc, ConnectionRefusedError) or type(exc).__name__ == "ConnectTimeout":
+        # connection never established, nothing was sent
+        return True
+
+    name = type(exc).__name__
+    if isinstance(exc, (ConnectionError, TimeoutError)) or "ConnectionError" in name or "Timeout" in name:
+        return idempotent
+
+    return False
+
+
+def _start(fn: Callable, args: tuple, kwargs: dict) -> Future:
+    # daemon threads, so a hung call abandoned after its timeout never blocks interpreter exit
+    future = Future()
+
+    def target():
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=target, daemon=True).start()
+    return future
+
+
+class RemoteCall:
+    """
+    Call policy for one remote operation: per-attempt timeout, exponential backoff with full jitter,
+    idempotency-aware retries and optional hedging.
+
+    Usage:
+        get_run = RemoteCall("workspace.get_run", timeout=60, hedge_after=5)
+        run = get_run(workspace.get_run, run_id)
+
+    Non-idempotent operations (`idempotent=False`) are only retried when the request provably wasn't processed.
+    With `hedge_after`, a duplicate request is sent if the first one hasn't answered within that many seconds
+    and the first response wins; only use it for idempotent reads.
+    Timed out attempts can't be cancelled, they're abandoned and keep running in a daemon thread.
+    """
+
+    def __init__(
+        self,
+        operation: str,
+        timeout: Optional[float] = None,
+        retries: int = 3,
+        backoff: float = 1.0,
+        max_backoff: float = 30.0,
+        idempotent: bool = True,
+        hedge_after: Optional[float] = None,
+        stats: Optional[CallStats] = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        if hedge_after is not None and not idempotent:
+            raise ValueError("hedged requests are only allowed for idempotent operations")
+
+        self.operation = operation
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.idempotent = idempotent
+        self.hedge_after = hedge_after
+        self.stats = stats or call_stats
+        self.sleep = sleep
+
+    def __call__(self, fn: Callable, *args, **kwargs):
+        self.stats.increment(self.operation, "calls")
+        start = time.perf_counter()
+
+        for attempt in range(self.retries + 1):
+            try:
+                result = self._attempt(fn, args, kwargs)
+            except Exception as e:
+                if attempt == self.retries or not is_retryable(e, self.idempotent):
+                    self.stats.increment(self.operation, "failures")
+                    raise
+
+                delay = random.uniform(0, min(self.max_backoff, self.backoff * 2**attempt))
+                self.stats.increment(self.operation, "retries")
+                logger.warning(
+                    f"{self.operation} failed ({e.__class__.__name__}: {e}), "
+                    f"retry {attempt + 1}/{self.retries} in {delay:.1f}s"
+                )
+                self.sleep(delay)
+            else:
+                self.stats.record_latency(self.operation, time.perf_counter() - start)
+                return result
+
+    def _attempt(self, fn: Callable, args: tuple, kwargs: dict):
+        if self.timeout is None and self.hedge_after is None:
+            return fn(*args, **kwargs)
+
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        futures = [_start(fn, args, kwargs)]
+
+        if self.hedge_after is not None and (self.timeout is None or self.hedge_after < self.timeout):
+            done, _ = wait(futures, timeout=self.hedge_after)
+            if not done:
+                self.stats.increment(self.operation, "hedges")
+                futures.append(_start(fn, args, kwargs))
+
+        pending = set(futures)
+        error = None
+        while pending:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            if not done:
+                break
+
+            for future in done:
+                if future.exception() is None:
+                    if future is not futures[0]:
+                        self.stats.increment(self.operation, "hedge_wins")
+                    return future.result()
+                error = future.exception()
+
+        if error is not None and not pending:
+            raise error
+
+        self.stats.increment(self.operation, "timeouts")
+        raise CallTimeoutError(f"{self.operation} timed out after {self.timeout}s")
@@ -21,6 +21,7 @@ _dependencies = [
     "questionary",
     "coloredlogs==15.0.1",
     "psutil",
+    "pyyaml",
     "pytest",
     "pytest-sugar",
     "pytest-cov",
@@ -49,6 +50,7 @@ extras = {}
 install_requires = [
     deps["questionary"],
     deps["psutil"],
+    deps["pyyaml"],
 ]
 
 print(find_namespace_packages())
@@ -0,0 +1,25 @@
+import logging
+import sys
+
+import pytest
+
+from happifyml import __main__
+from happifyml.utils import RemoteCall, call_stats
+
+
+@pytest.fixture
+def clean_call_stats():
+    call_stats.reset()
+    yield call_stats
+    call_stats.reset()
+
+
+def test_main_logs_call_stats(clean_call_stats, monkeypatch, caplog):
+    RemoteCall("workspace.get_run")(lambda: None)
+    monkeypatch.setattr(sys, "argv", ["happifyml", "--debug", "--version"])
+
+    with caplog.at_level(logging.DEBUG, logger=__main__.logger.name):
+        __main__.main()
+
+    [record] = [record for record in caplog.records if record.getMessage().startswith("workspace.get_run")]
+    assert "calls=1" in record.getMessage() and "p99_ms=" in record.getMessage()
@@ -0,0 +1,53 @@
+from argparse import Namespace
+
+import pytest
+
+from happifyml.cli import cloud
+
+
+def register_args(**kwargs):
+    args = dict(
+        relogin=False,
+        run_ids=["run_1", "run_2"],
+        model_name="model",
+        model_path="outputs/model",
+        experiment="sweep",
+        metric=None,
+        goal="max",
+        top=None,
+        workers=8,
+    )
+    args.update(kwargs)
+    return Namespace(**args)
+
+
+@pytest.fixture
+def registered(monkeypatch):
+    rows = []
+
+    class FakeAzureML:
+        def register_models(self, **kwargs):
+            return rows
+
+    monkeypatch.setattr(cloud, "get_azure", lambda args: FakeAzureML())
+    return rows
+
+
+def test_register_succeeds(registered):
+    registered.extend([{"status": "registered version 1"}, {"status": "skipped, same as version 1"}])
+    cloud.run_azure_register(register_args())
+
+
+@pytest.mark.parametrize(
+    "statuses", [["registered version 1", "failed, ValueError: no files"], ["failed, ValueError: no files"], []]
+)
+def test_register_fails(registered, statuses):
+    registered.extend({"status": status} for status in statuses)
+    with pytest.raises(SystemExit) as exit_info:
+        cloud.run_azure_register(register_args(run_ids=[], top=2))
+    assert exit_info.value.code == 1
+
+
+def test_register_requires_runs_or_metric(registered):
+    with pytest.raises(SystemExit):
+        cloud.run_azure_register(register_args(run_ids=[]))
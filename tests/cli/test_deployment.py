@@ -0,0 +1,46 @@
+import pytest
+
+from happifyml.cli.deployment import MODEL_CACHE_MOUNT, prefetch_init_container
+
+CREDENTIALS = {"subscription_id": "sub", "resource_group": "group", "workspace_name": "ws"}
+
+
+def test_prefetch_init_container():
+    config = {"image": "serving:1", "prefetch": {"models": ["intent:3", "sentiment"], "convert": True, "workers": 2}}
+
+    container = prefetch_init_container(config, CREDENTIALS)
+    assert container["image"] == "serving:1"
+    assert container["command"] == [
+        "hml",
+        "models",
+        "prefetch",
+        "intent:3",
+        "sentiment",
+        "--subscription-id",
+        "sub",
+        "--resource-group",
+        "group",
+        "--workspace-name",
+        "ws",
+        "--convert",
+        "--workers",
+        "2",
+    ]
+    assert container["env"] == [{"name": "HAPPIFYML_CACHE", "value": MODEL_CACHE_MOUNT}]
+
+    assert prefetch_init_container({"image": "serving:1"}, CREDENTIALS) is None
+
+
+def test_prefetch_init_container_workspace():
+    workspace = {"subscription_id": "other", "resource_group": "group", "workspace_name": "prod"}
+    config = {"prefetch": {"models": ["intent"], "workspace": workspace}}
+
+    command = prefetch_init_container(config, CREDENTIALS)["command"]
+    assert command[command.index("--subscription-id") + 1] == "other"
+    assert command[command.index("--workspace-name") + 1] == "prod"
+
+    # never left to prompt inside the container
+    with pytest.raises(ValueError, match="workspace"):
+        prefetch_init_container({"prefetch": {"models": ["intent"]}}, None)
+    with pytest.raises(ValueError, match="models"):
+        prefetch_init_container({"prefetch": {"convert": True}}, CREDENTIALS)
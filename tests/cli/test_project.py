@@ -0,0 +1,44 @@
+import os
+import subprocess
+import sys
+
+import torch
+
+from happifyml.cli.project import create_project
+
+
+def test_create_project(tmp_path):
+    path = str(tmp_path / "my-model")
+    os.makedirs(path)
+    create_project(path)
+
+    for filename in ["train.py", "data.py", "model.py", "callbacks.py", "environment.yaml", "README.md"]:
+        assert os.path.exists(os.path.join(path, filename))
+    with open(os.path.join(path, "environment.yaml")) as f:
+        assert f.readline().strip() == "name: my-model"
+
+
+def test_project_smoke_epoch_on_cpu(tmp_path):
+    path = str(tmp_path / "my-model")
+    os.makedirs(path)
+    create_project(path)
+
+    env = {key: value for key, value in os.environ.items() if not key.startswith(("AZ_BATCH", "WORLD_SIZE"))}
+    env["CUDA_VISIBLE_DEVICES"] = ""
+    # the project imports happifyml, which may not be installed
+    repo_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [repo_root, env.get("PYTHONPATH")]))
+    result = subprocess.run(
+        [sys.executable, "train.py", "--epochs", "1", "--num-workers", "0", "--log-every", "4", "--accumulate", "3"],
+        cwd=path,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=300,
+    )
+
+    assert result.returncode == 0, result.stderr
+    assert "samples/s" in result.stdout
+    # 1024 samples in batches of 64: 5 full accumulation windows and a last one of a single batch
+    checkpoint = torch.load(os.path.join(path, "outputs", "last.pt"))
+    assert checkpoint["step"] == 6
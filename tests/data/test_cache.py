@@ -0,0 +1,90 @@
+import threading
+
+import numpy as np
+import pytest
+
+from happifyml.data import TokenizedCache, benchmark_throughput
+
+
+class ToyTokenizer:
+    def __init__(self):
+        self.vocab = {}
+        self.calls = 0
+
+    def get_vocab(self):
+        return {}
+
+    def encode(self, text):
+        self.calls += 1
+        return [self.vocab.setdefault(word, len(self.vocab)) for word in text.split()]
+
+
+TEXTS = ["the quick brown fox", "jumps over", "the lazy dog"] * 10
+
+
+def test_build_and_index(tmp_path):
+    cache = TokenizedCache.build(TEXTS, ToyTokenizer(), cache_dir=str(tmp_path))
+
+    assert len(cache) == len(TEXTS)
+    assert cache.num_tokens == sum(len(text.split()) for text in TEXTS)
+    np.testing.assert_array_equal(cache[1], [4, 5])
+    # documents are views over the mmap, not copies
+    assert np.shares_memory(cache[0], cache.tokens)
+
+
+@pytest.mark.parametrize("texts", [[], ["", ""]])
+def test_build_empty_corpus(tmp_path, texts):
+    cache = TokenizedCache.build(texts, ToyTokenizer(), cache_dir=str(tmp_path))
+
+    assert len(cache) == len(texts)
+    assert cache.num_tokens == 0
+    assert list(cache.iter_batches(batch_size=2, seq_len=4)) == []
+    # and it loads again from the cache
+    assert TokenizedCache.build(texts, ToyTokenizer(), cache_dir=str(tmp_path)).num_tokens == 0
+
+
+def test_build_is_cached(tmp_path):
+    TokenizedCache.build(TEXTS, ToyTokenizer(), cache_dir=str(tmp_path))
+
+    tokenizer = ToyTokenizer()
+    TokenizedCache.build(TEXTS, tokenizer, cache_dir=str(tmp_path))
+    assert tokenizer.calls == 0
+
+
+def test_other_ranks_wait_for_local_rank_zero(tmp_path):
+    results = {}
+
+    def load(rank):
+        tokenizer = ToyTokenizer()
+        cache = TokenizedCache.build(TEXTS, tokenizer, cache_dir=str(tmp_path), local_rank=rank, poll_interval=0.01)
+        results[rank] = (cache, tokenizer)
+
+    waiter = threading.Thread(target=load, args=(1,))
+    waiter.start()
+    load(0)
+    waiter.join(timeout=10)
+
+    assert results[1][0].num_tokens == results[0][0].num_tokens
+    assert results[1][1].calls == 0
+
+
+def test_iter_batches_shards_across_ranks(tmp_path):
+    cache = TokenizedCache.build(TEXTS, ToyTokenizer(), cache_dir=str(tmp_path))
+
+    rank0 = list(cache.iter_batches(batch_size=2, seq_len=3, rank=0, world_size=2))
+    rank1 = list(cache.iter_batches(batch_size=2, seq_len=3, rank=1, world_size=2))
+
+    assert len(rank0) == len(rank1) > 0
+    assert rank0[0].shape == (2, 3)
+    assert rank0[0].flatten().tolist() == cache.tokens[:6].tolist()
+    assert rank1[0].flatten().tolist() == cache.tokens[6:12].tolist()
+
+
+@pytest.mark.slow
+def test_throughput_benchmark(tmp_path):
+    texts = [" ".join(f"w{i % 5000}" for i in range(j, j + 512)) for j in range(2000)]
+    cache = TokenizedCache.build(texts, ToyTokenizer(), cache_dir=str(tmp_path))
+
+    stats = benchmark_throughput(cache, batch_size=32, seq_len=512)
+    print(f"tokenized cache throughput: {stats['tokens_per_sec'] / 1e6:.1f}M tokens/s")
+    assert stats["tokens_per_sec"] > 0
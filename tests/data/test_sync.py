@@ -0,0 +1,120 @@
+import json
+import os
+
+import pytest
+
+from happifyml.data import LocalDatastore, parse_data_spec, pull, push
+from happifyml.data.sync import find_dataset_root, materialize, read_manifest
+
+
+class CountingDatastore(LocalDatastore):
+    def __init__(self, root):
+        super().__init__(root)
+        self.uploaded = []
+        self.downloaded = []
+
+    def upload(self, files):
+        self.uploaded.extend(files)
+        super().upload(files)
+
+    def download(self, files):
+        self.downloaded.extend(files)
+        super().download(files)
+
+
+def write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(text)
+
+
+@pytest.fixture
+def dataset_dir(tmp_path):
+    root = tmp_path / "corpus"
+    write(str(root / "train.txt"), "hello world")
+    write(str(root / "nested" / "dev.txt"), "dev split")
+    write(str(root / "nested" / "copy.txt"), "dev split")
+    return str(root)
+
+
+def test_push_uploads_only_changed_files(tmp_path, dataset_dir):
+    datastore = CountingDatastore(str(tmp_path / "store"))
+
+    stats = push(datastore, dataset_dir, "corpus")
+    assert stats["version"] == 1
+    assert stats["files"] == 3
+    # identical files share one object
+    assert stats["uploaded"] == 2
+
+    write(os.path.join(dataset_dir, "train.txt"), "hello again")
+    datastore.uploaded.clear()
+    stats = push(datastore, dataset_dir, "corpus")
+    assert stats["version"] == 2
+    assert len(datastore.uploaded) == 1
+
+    assert json.loads(datastore.read_text("datasets/corpus/versions.json")) == [1, 2]
+
+
+def test_push_existing_version_fails(tmp_path, dataset_dir):
+    datastore = LocalDatastore(str(tmp_path / "store"))
+    push(datastore, dataset_dir, "corpus", version=3)
+
+    with pytest.raises(ValueError):
+        push(datastore, dataset_dir, "corpus", version=3)
+
+
+def test_pull_skips_matching_files(tmp_path, dataset_dir):
+    datastore = CountingDatastore(str(tmp_path / "store"))
+    push(datastore, dataset_dir, "corpus")
+    target = str(tmp_path / "pulled")
+
+    stats = pull(datastore, "corpus", 1, target)
+    assert stats["downloaded"] == 2
+    with open(os.path.join(target, "nested", "copy.txt")) as f:
+        assert f.read() == "dev split"
+
+    write(os.path.join(target, "train.txt"), "stale")
+    stats = pull(datastore, "corpus", 1, target)
+    assert stats["downloaded"] == 1
+    with open(os.path.join(target, "train.txt")) as f:
+        assert f.read() == "hello world"
+
+
+def test_materialize_links_objects(tmp_path, dataset_dir):
+    datastore = LocalDatastore(str(tmp_path / "store"))
+    push(datastore, dataset_dir, "corpus")
+
+    manifest = read_manifest(datastore, "corpus", 1)
+    target = materialize(manifest, str(tmp_path / "store" / "datasets" / "corpus"), str(tmp_path / "linked"))
+
+    with open(os.path.join(target, "nested", "dev.txt")) as f:
+        assert f.read() == "dev split"
+
+
+def test_find_dataset_root(tmp_path, dataset_dir, monkeypatch):
+    datastore = LocalDatastore(str(tmp_path / "store"))
+    push(datastore, dataset_dir, "corpus")
+    push(datastore, dataset_dir, "corpus", version=2)
+
+    # downloaded inputs keep the datastore path
+    assert find_dataset_root(str(tmp_path / "store"), "2") == str(tmp_path / "store" / "datasets" / "corpus")
+    with pytest.raises(FileNotFoundError):
+        find_dataset_root(str(tmp_path / "store"), "3")
+
+    # mounted inputs are the dataset prefix, which mustn't be listed
+    def walk(*args, **kwargs):
+        raise AssertionError("walked the mount")
+
+    monkeypatch.setattr(os, "walk", walk)
+    mount = str(tmp_path / "store" / "datasets" / "corpus")
+    assert find_dataset_root(mount, "1") == mount
+
+
+def test_parse_data_spec():
+    assert parse_data_spec("corpus:2") == ("corpus", 2, "mount")
+    assert parse_data_spec("corpus:2:download") == ("corpus", 2, "download")
+
+    with pytest.raises(ValueError):
+        parse_data_spec("corpus")
+    with pytest.raises(ValueError):
+        parse_data_spec("corpus:2:copy")
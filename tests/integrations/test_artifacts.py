@@ -0,0 +1,113 @@
+import os
+
+import pytest
+
+from happifyml.integrations import azure
+from happifyml.integrations.artifacts import MANIFEST_NAME, filter_files, match_file, pull_runs
+
+
+class FakeRun:
+    def __init__(self, run_id, files):
+        self.id = run_id
+        self.files = files
+        self.downloaded = []
+
+    def get_file_names(self):
+        return list(self.files)
+
+    def download_file(self, name, output_file_path):
+        if self.files[name] is None:
+            raise PermissionError("access denied")
+        if self.files[name] is KeyboardInterrupt:
+            raise KeyboardInterrupt
+        self.downloaded.append(name)
+        with open(output_file_path, "w") as f:
+            f.write(self.files[name])
+
+
+@pytest.mark.parametrize(
+    "name, pattern, matches",
+    [
+        ("eval/a.json", "eval/*.json", True),
+        ("eval/sub/b.json", "eval/*.json", False),
+        ("eval/sub/b.json", "eval/**/*.json", True),
+        ("eval/a.json", "eval/**/*.json", True),
+        ("outputs/model/weights.ckpt", "*.ckpt", True),
+        ("outputs/model/weights.ckpt", "outputs/*", False),
+        ("outputs/model/weights.ckpt", "outputs/**", True),
+        ("logs/eval/a.json", "eval/*.json", False),
+    ],
+)
+def test_match_file(name, pattern, matches):
+    assert match_file(name, pattern) == matches
+
+
+def test_filter_files():
+    names = ["eval/a.json", "eval/sub/b.json", "outputs/model.ckpt", "outputs/config.json"]
+
+    assert filter_files(names) == names
+    assert filter_files(names, include=["eval/*.json"]) == ["eval/a.json"]
+    assert filter_files(names, include=["*.json"], exclude=["eval/**"]) == ["outputs/config.json"]
+
+
+def test_pull_runs(tmp_path):
+    runs = [
+        FakeRun("run-1", {"eval/a.json": "a", "eval/sub/b.json": "b", "outputs/model.ckpt": "weights"}),
+        FakeRun("run-2", {"eval/a.json": "a2", "eval/broken.json": None}),
+    ]
+
+    stats = pull_runs(runs, str(tmp_path), include=["eval/**"], exclude=["b.json"])
+    assert stats["files"] == 3
+    assert stats["downloaded"] == 2
+    assert stats["failed"] == ["run-2/eval/broken.json"]
+    assert sorted(runs[0].downloaded) == ["eval/a.json"]
+    with open(tmp_path / "run-2" / "eval" / "a.json") as f:
+        assert f.read() == "a2"
+    assert os.path.exists(tmp_path / "run-1" / MANIFEST_NAME)
+
+    # only new or locally modified files are downloaded again
+    with open(tmp_path / "run-1" / "eval" / "a.json", "w") as f:
+        f.write("modified")
+    runs[1].downloaded.clear()
+    stats = pull_runs(runs, str(tmp_path), include=["eval/*.json"])
+    assert stats["files"] == 3
+    assert stats["skipped"] == 1
+    assert runs[0].downloaded == ["eval/a.json", "eval/a.json"]
+    assert runs[1].downloaded == []
+    with open(tmp_path / "run-1" / "eval" / "a.json") as f:
+        assert f.read() == "a"
+
+
+def test_interrupted_pull_keeps_completed_files(tmp_path):
+    files = {"a.json": "a", "b.json": KeyboardInterrupt, "c.json": "c", "d.json": "d"}
+    runs = [FakeRun("run-1", files)]
+
+    with pytest.raises(KeyboardInterrupt):
+        pull_runs(runs, str(tmp_path), max_workers=1)
+    assert runs[0].downloaded[0] == "a.json"
+
+    files["b.json"] = "b"
+    runs[0].downloaded.clear()
+    stats = pull_runs(runs, str(tmp_path), max_workers=1)
+    assert stats["skipped"] >= 1 and "a.json" not in runs[0].downloaded
+    assert stats["downloaded"] + stats["skipped"] == 4
+
+
+class FailingListRun(FakeRun):
+    def get_file_names(self):
+        raise PermissionError("access denied")
+
+
+def test_pull_continues_after_failed_runs(tmp_path):
+    runs = [FailingListRun("run-1", {}), FakeRun("run-2", {"a.json": "a"})]
+
+    stats = pull_runs(runs, str(tmp_path))
+    assert stats["failed"] == ["run-1"]
+    assert stats["downloaded"] == 1
+
+    aml = azure.AzureML.__new__(azure.AzureML)
+    aml.workspace = type("Workspace", (), {"get_run": lambda self, run_id: {"run-2": runs[1]}[run_id]})()
+    stats = aml.pull(["run-0", "run-2"], output_dir=str(tmp_path), include=["*.json"])
+    assert stats["runs"] == 2
+    assert stats["failed"] == ["run-0"]
+    assert stats["skipped"] == 1
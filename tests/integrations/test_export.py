@@ -0,0 +1,159 @@
+import os
+
+import pytest
+import torch
+
+from happifyml.integrations.export import copy_model_assets, export_model, export_name, export_tags
+
+
+class TinyClassifier(torch.nn.Module):
+    """
+    Takes hf style keyword inputs and returns a tuple, like a `ModelOutput` with `return_dict=False`.
+    """
+
+    def __init__(self, vocab_size=100, hidden_size=32, num_labels=3):
+        super().__init__()
+        self.embeddings = torch.nn.Embedding(vocab_size, hidden_size)
+        self.dense = torch.nn.Linear(hidden_size, hidden_size)
+        self.classifier = torch.nn.Linear(hidden_size, num_labels)
+
+    def forward(self, input_ids, attention_mask):
+        hidden = torch.tanh(self.dense(self.embeddings(input_ids)))
+        mask = attention_mask.unsqueeze(-1).float()
+        pooled = (hidden * mask).sum(1) / mask.sum(1)
+        return (self.classifier(pooled),)
+
+
+@pytest.fixture
+def model_and_inputs():
+    torch.manual_seed(0)
+    inputs = {
+        "input_ids": torch.randint(0, 100, (2, 8)),
+        "attention_mask": torch.tensor([[1] * 8, [1] * 5 + [0] * 3]),
+    }
+    return TinyClassifier().train(), inputs
+
+
+@pytest.mark.parametrize("quantize", [False, True])
+def test_export_torchscript(tmp_path, model_and_inputs, quantize):
+    model, inputs = model_and_inputs
+    result = export_model(model, inputs, str(tmp_path), "torchscript", quantize=quantize)
+
+    assert os.path.basename(result["path"]) == ("model.int8.pt" if quantize else "model.pt")
+    assert result["quantized"] is quantize
+    assert result["size_mb"] > 0 and result["latency_ms"] > 0
+    assert result["max_abs_diff"] < (5e-2 if quantize else 1e-4)
+    # the eager model is left as it was
+    assert model.training
+
+    scripted = torch.jit.load(result["path"])
+    with torch.no_grad():
+        expected = model.eval()(**inputs)[0]
+        assert torch.allclose(scripted(inputs["input_ids"], inputs["attention_mask"]), expected, atol=5e-2)
+
+
+@pytest.mark.parametrize("quantize", [False, True])
+def test_export_onnx(tmp_path, model_and_inputs, quantize):
+    pytest.importorskip("onnxruntime")
+    model, inputs = model_and_inputs
+    result = export_model(model, inputs, str(tmp_path), "onnx", quantize=quantize)
+
+    assert os.path.basename(result["path"]) == ("model.int8.onnx" if quantize else "model.onnx")
+    assert os.listdir(tmp_path) == [os.path.basename(result["path"])]
+    assert result["max_abs_diff"] < (5e-2 if quantize else 1e-4)
+
+
+def test_export_rejects_divergence(tmp_path, model_and_inputs):
+    model, inputs = model_and_inputs
+    with pytest.raises(ValueError, match="diverges"):
+        export_model(model, inputs, str(tmp_path), "torchscript", quantize=True, atol=0.0)
+
+
+def test_export_rejects_unknown_format(tmp_path, model_and_inputs):
+    model, inputs = model_and_inputs
+    with pytest.raises(ValueError):
+        export_model(model, inputs, str(tmp_path), "tflite")
+
+
+def test_export_name_and_tags():
+    assert export_name("intent", "onnx") == "intent-onnx"
+    assert export_name("intent", "torchscript", quantize=True) == "intent-torchscript-int8"
+
+    result = {
+        "format": "onnx",
+        "quantized": True,
+        "max_abs_diff": 0.01,
+        "latency_ms": 1.5,
+        "latency_p90_ms": 2.0,
+        "size_mb": 10.0,
+    }
+    tags = export_tags(result)
+    assert tags["quantization"] == "dynamic-int8"
+    assert all(isinstance(value, str) for value in tags.values())
+
+
+def test_copy_model_assets_skips_weights(tmp_path):
+    source, export_dir = tmp_path / "model", tmp_path / "export"
+    source.mkdir()
+    export_dir.mkdir()
+    for filename in ["config.json", "vocab.txt", "pytorch_model.bin", "pytorch_model-00001-of-00002.bin"]:
+        (source / filename).write_text("{}")
+
+    copy_model_assets(str(source), str(export_dir))
+    assert sorted(os.listdir(export_dir)) == ["config.json", "vocab.txt"]
+
+
+class FakeModel:
+    """
+    Registry model whose download is a tiny hf classifier, counting downloads.
+    """
+
+    downloads = 0
+
+    def __init__(self, workspace, name, version=None):
+        self.name = name
+        self.version = version or 1
+
+    def download(self, target_dir):
+        transformers = pytest.importorskip("transformers")
+
+        FakeModel.downloads += 1
+        config = transformers.BertConfig(
+            vocab_size=100, hidden_size=32, num_hidden_layers=1, num_attention_heads=2, intermediate_size=64
+        )
+        config.architectures = ["BertForSequenceClassification"]
+        model_dir = os.path.join(target_dir, self.name)
+        transformers.BertForSequenceClassification(config).save_pretrained(model_dir)
+        return model_dir
+
+
+def test_azure_export_uses_model_cache(tmp_path, monkeypatch):
+    pytest.importorskip("transformers")
+    from happifyml.integrations import azure
+
+    monkeypatch.setattr(azure, "Model", FakeModel)
+    monkeypatch.setattr(azure, "MODEL_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(FakeModel, "downloads", 0)
+    tmp = tmp_path / "tmp"
+    tmp.mkdir()
+    monkeypatch.setattr(azure.tempfile, "tempdir", str(tmp))
+
+    pushed = []
+
+    def push_to_azure(model_path, workspace, model_name=None, **kwargs):
+        pushed.append((model_name, sorted(os.listdir(model_path)), kwargs["tags"]))
+        return FakeModel(workspace, model_name)
+
+    monkeypatch.setattr(azure.AzureMixin, "push_to_azure", staticmethod(push_to_azure))
+    aml = azure.AzureML.__new__(azure.AzureML)
+    aml.workspace = type("Workspace", (), {"name": "fake"})()
+
+    aml.export("intent", version=3, export_format="torchscript")
+    aml.export("intent", version=3, export_format="torchscript", quantize=True)
+
+    assert FakeModel.downloads == 1
+    assert [name for name, _, _ in pushed] == ["intent-torchscript", "intent-torchscript-int8"]
+    assert "config.json" in pushed[0][1] and "model.safetensors" not in pushed[0][1]
+    assert pushed[0][2]["source_model"] == "intent" and pushed[0][2]["source_version"] == "3"
+    # neither the source nor the exports are left in the temporary directory
+    assert os.listdir(tmp) == []
@@ -0,0 +1,201 @@
+import io
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import torch
+
+from happifyml.integrations import azure
+from happifyml.integrations.sharding import WEIGHTS_NAME, init_empty_weights, load_sharded
+
+
+class FakeRegistry:
+    """
+    Model registry of a fake workspace: `Model(workspace, name, version)` resolves versions against it
+    and `download` writes an hf-like model directory, like azureml does under `target_dir/<name>`.
+    """
+
+    name = "fake"
+
+    def __init__(self, models):
+        self.models = models
+        self.lookups = 0
+        self.downloads = 0
+        self._lock = threading.Lock()
+
+    def model_class(registry):
+        class FakeModel:
+            def __init__(self, workspace, name, version=None):
+                registry.lookups += 1
+                if name not in registry.models:
+                    raise RuntimeError(f"Model {name} not found")
+                self.name = name
+                self.version = version or max(registry.models[name])
+
+            def download(self, target_dir):
+                with registry._lock:
+                    registry.downloads += 1
+                model_dir = os.path.join(target_dir, self.name)
+                os.makedirs(model_dir)
+                with open(os.path.join(model_dir, "config.json"), "w") as f:
+                    f.write('{"version": %d}' % self.version)
+                torch.manual_seed(self.version)
+                # legacy (non-zipfile) format, which can't be memory-mapped
+                torch.save(
+                    torch.nn.Linear(16, 16).state_dict(),
+                    os.path.join(model_dir, WEIGHTS_NAME),
+                    _use_new_zipfile_serialization=False,
+                )
+                return model_dir
+
+        return FakeModel
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    registry = FakeRegistry({"bert": [1, 2], "roberta": [3]})
+    monkeypatch.setattr(azure, "Model", registry.model_class())
+    return registry
+
+
+@pytest.fixture
+def aml(registry):
+    aml = azure.AzureML.__new__(azure.AzureML)
+    aml.workspace = registry
+    return aml
+
+
+def load_linear(path):
+    with init_empty_weights():
+        model = torch.nn.Linear(16, 16)
+    return load_sharded(model, path)
+
+
+def test_download_model_caches(tmp_path, registry):
+    path = azure.download_model(registry, "bert", cache_dir=str(tmp_path))
+    assert path == os.path.join(tmp_path, "bert", "2")
+    assert os.path.islink(path) and sorted(os.listdir(path)) == ["config.json", WEIGHTS_NAME]
+    assert registry.downloads == 1
+
+    # pinned versions in the cache don't even look up the registry
+    lookups = registry.lookups
+    assert azure.download_model(registry, "bert", 2, cache_dir=str(tmp_path)) == path
+    assert registry.lookups == lookups and registry.downloads == 1
+
+    azure.download_model(registry, "bert", 1, cache_dir=str(tmp_path))
+    assert registry.downloads == 2
+    # nothing but entries, their content and locks
+    assert {name for name in os.listdir(tmp_path / "bert") if not name.startswith(".")} == {
+        "1",
+        "1.lock",
+        "2",
+        "2.lock",
+    }
+
+
+def test_download_model_retries_interrupted_download(tmp_path, registry, monkeypatch):
+    def fail(*args, **kwargs):
+        raise ConnectionResetError("connection lost")
+
+    monkeypatch.setattr(azure, "_download_model", fail)
+    with pytest.raises(ConnectionResetError):
+        azure.download_model(registry, "bert", 2, cache_dir=str(tmp_path))
+    assert not os.path.exists(tmp_path / "bert" / "2")
+
+    monkeypatch.undo()
+    monkeypatch.setattr(azure, "Model", registry.model_class())
+    path = azure.download_model(registry, "bert", 2, cache_dir=str(tmp_path))
+    assert os.path.exists(os.path.join(path, WEIGHTS_NAME))
+    # the partial download is cleaned up
+    assert len([name for name in os.listdir(tmp_path / "bert") if name.startswith(".")]) == 1
+
+
+def test_prefetch(tmp_path, aml, registry):
+    results = aml.prefetch(["bert", "roberta:3", "gpt", "bert:x"], cache_dir=str(tmp_path))
+
+    assert results["bert"] == os.path.join(tmp_path, "bert", "2")
+    assert results["roberta:3"] == os.path.join(tmp_path, "roberta", "3")
+    assert isinstance(results["gpt"], RuntimeError)
+    assert isinstance(results["bert:x"], ValueError)
+    assert registry.downloads == 2
+
+
+def test_prefetch_convert(tmp_path, aml, registry):
+    path = aml.prefetch(["bert:2"], cache_dir=str(tmp_path))["bert:2"]
+    original = load_linear(path).state_dict()
+    original_content = os.path.realpath(path)
+
+    results = aml.prefetch(["bert:2"], convert=True, cache_dir=str(tmp_path))
+    assert results["bert:2"] == path
+    assert os.path.exists(os.path.join(path, azure.FAST_LOAD_MARKER))
+    assert os.path.exists(os.path.join(path, "config.json"))
+    # swapped in as new content, the original content is gone
+    assert os.path.realpath(path) != original_content and not os.path.exists(original_content)
+
+    converted = load_linear(path).state_dict()
+    assert all(torch.equal(original[name], converted[name]) for name in original)
+
+    content = os.path.realpath(path)
+    assert not azure.convert_cached_model(path)
+    assert os.path.realpath(path) == content
+
+
+def test_interrupted_conversion_keeps_original(tmp_path, aml, registry, monkeypatch):
+    path = aml.prefetch(["bert:2"], cache_dir=str(tmp_path))["bert:2"]
+
+    def fail(*args, **kwargs):
+        raise MemoryError
+
+    monkeypatch.setattr(azure, "convert_to_fast_load", fail)
+    assert isinstance(aml.prefetch(["bert:2"], convert=True, cache_dir=str(tmp_path))["bert:2"], MemoryError)
+    assert os.path.exists(os.path.join(path, WEIGHTS_NAME))
+    assert not os.path.exists(os.path.join(path, azure.FAST_LOAD_MARKER))
+    load_linear(path)
+
+    monkeypatch.undo()
+    monkeypatch.setattr(azure, "Model", registry.model_class())
+    assert azure.convert_cached_model(path)
+    # leftovers of the failed conversion are cleaned up with the original content
+    assert len([name for name in os.listdir(tmp_path / "bert") if name.startswith(".")]) == 1
+
+
+def test_concurrent_prefetch(tmp_path, aml, registry):
+    with ThreadPoolExecutor(4) as executor:
+        results = list(
+            executor.map(lambda _: aml.prefetch(["bert:2"], convert=True, cache_dir=str(tmp_path)), range(4))
+        )
+
+    assert all(result == {"bert:2": os.path.join(tmp_path, "bert", "2")} for result in results)
+    assert registry.downloads == 1
+    load_linear(results[0]["bert:2"])
+
+
+def test_cached_model_blocks_conversion(tmp_path, registry):
+    converted = threading.Event()
+
+    with azure.cached_model(registry, "bert", 2, cache_dir=str(tmp_path)) as model_dir:
+        thread = threading.Thread(
+            target=lambda: azure.convert_cached_model(os.path.join(tmp_path, "bert", "2")) and converted.set()
+        )
+        thread.start()
+        assert not converted.wait(0.5)
+        # still the original files while loading
+        assert os.path.exists(os.path.join(model_dir, WEIGHTS_NAME))
+        load_linear(model_dir)
+
+    thread.join()
+    assert converted.is_set()
+
+
+def test_login_without_terminal(monkeypatch):
+    monkeypatch.setattr(azure.AzureCredentials, "get", classmethod(lambda cls: None))
+    monkeypatch.setattr(azure.sys, "stdin", io.StringIO())
+    monkeypatch.delitem(sys.modules, "ipykernel", raising=False)
+
+    with pytest.raises(RuntimeError, match="no terminal"):
+        azure.AzureML.login()
+
+    credentials = azure.AzureML.login("sub", "group", "ws")
+    assert credentials == {"subscription_id": "sub", "resource_group": "group", "workspace_name": "ws"}
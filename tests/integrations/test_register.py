@@ -0,0 +1,161 @@
+import threading
+
+import pytest
+
+import azureml.core
+from happifyml.integrations import azure
+from happifyml.integrations.artifacts import artifact_id
+
+# registrations run concurrently
+REGISTRY_LOCK = threading.Lock()
+
+
+class FakeRegisteredModel:
+    def __init__(self, name, version, tags):
+        self.name = name
+        self.version = version
+        self.tags = tags
+
+
+class FakeWorkspace:
+    """
+    Runs and model registry of a workspace, registered models live in `models`.
+    """
+
+    name = "fake"
+
+    def __init__(self, runs):
+        self.runs = {run.id: run for run in runs}
+        self.models = []
+
+    def get_run(self, run_id):
+        return self.runs[run_id]
+
+    def list_models(self, workspace, name=None):
+        return [model for model in reversed(self.models) if model.name == name]
+
+
+class FakeRun:
+    def __init__(self, workspace_models, run_id, metrics=None, status="Completed", files=None):
+        self.id = run_id
+        self.status = status
+        self.metrics = metrics or {}
+        self.files = ["outputs/model/config.json", "outputs/model/pytorch_model.bin"] if files is None else files
+        self._models = workspace_models
+
+    def get_file_names(self):
+        return self.files + ["logs/std_log.txt"]
+
+    def get_details(self):
+        return {"endTimeUtc": "2021-06-02T18:20:42Z"}
+
+    def get_metrics(self, name=None):
+        return {name: self.metrics[name]} if name in self.metrics else {}
+
+    def register_model(self, model_name, model_path, tags):
+        if not any(name.startswith(model_path) for name in self.files):
+            raise ValueError(f"No files to upload under {model_path}")
+        with REGISTRY_LOCK:
+            model = FakeRegisteredModel(model_name, len(self._models) + 1, tags)
+            self._models.append(model)
+        return model
+
+
+@pytest.fixture
+def make_aml(monkeypatch):
+    def make(*run_specs):
+        models = []
+        runs = [FakeRun(models, run_id, **kwargs) for run_id, kwargs in run_specs]
+        workspace = FakeWorkspace(runs)
+        workspace.models = models
+
+        class FakeModel:
+            list = staticmethod(workspace.list_models)
+
+        class FakeExperiment:
+            def __init__(self, workspace, name):
+                pass
+
+            def get_runs(self, include_children=False):
+                return iter(runs)
+
+        monkeypatch.setattr(azure, "Model", FakeModel)
+        monkeypatch.setattr(azureml.core, "Experiment", FakeExperiment)
+
+        aml = azure.AzureML.__new__(azure.AzureML)
+        aml.workspace = workspace
+        return aml
+
+    return make
+
+
+def test_register_run_ids_skips_registered(make_aml, capsys):
+    aml = make_aml(("run_1", {}), ("run_2", {}))
+
+    rows = aml.register_models("model", "outputs/model", run_ids=["run_1", "run_2", "run_1"])
+    # registered concurrently, in any order
+    assert sorted(row["status"] for row in rows) == ["registered version 1", "registered version 2"]
+    versions = {model.tags["run_id"]: model.version for model in aml.workspace.models}
+    assert sorted(versions) == ["run_1", "run_2"]
+
+    rows = aml.register_models("model", "outputs/model", run_ids=["run_2"])
+    assert rows[0]["status"] == f"skipped, same as version {versions['run_2']}"
+    assert len(aml.workspace.models) == 2
+
+    table = capsys.readouterr().out.splitlines()
+    assert table[-3].split() == ["run", "metric", "ended", "(UTC)", "status"]
+    assert table[-1].split()[0] == "run_2" and table[-1].endswith(rows[0]["status"])
+
+
+def test_register_top_runs_of_experiment(make_aml):
+    aml = make_aml(
+        ("run_1", {"metrics": {"acc": [0.5, 0.7]}}),
+        ("run_2", {"metrics": {"acc": 0.9}}),
+        ("run_3", {"metrics": {"acc": [0.8]}}),
+        ("run_4", {"metrics": {"acc": 0.99}, "status": "Failed"}),
+        ("sweep", {}),
+    )
+
+    rows = aml.register_models("model", "outputs/model", experiment_name="sweep", metric="acc", top=2)
+    assert [(row["run_id"], row["metric"]) for row in rows] == [("run_2", 0.9), ("run_3", 0.8)]
+    # registered concurrently
+    assert sorted(model.tags["acc"] for model in aml.workspace.models) == ["0.8", "0.9"]
+
+    rows = aml.register_models("model", "outputs/model", experiment_name="sweep", metric="acc", goal="min")
+    assert [row["run_id"] for row in rows] == ["run_1", "run_3", "run_2"]
+    assert [row["status"].split(",")[0] for row in rows][1:] == ["skipped", "skipped"]
+
+
+def test_register_top_skips_runs_without_model(make_aml):
+    # sweep parents come first and log the best child's metric, but have no model files of their own
+    aml = make_aml(
+        ("sweep", {"metrics": {"acc": 0.9}, "files": []}),
+        ("run_1", {"metrics": {"acc": 0.9}}),
+        ("run_2", {"metrics": {"acc": 0.7}}),
+        ("run_3", {}),
+    )
+
+    rows = aml.register_models("model", "outputs/model", experiment_name="sweep", top=2)
+    assert [row["run_id"] for row in rows] == ["run_1", "run_2"]
+
+    rows = aml.register_models("model", "outputs/model", experiment_name="sweep", metric="acc")
+    assert [row["run_id"] for row in rows] == ["run_1", "run_2"]
+    assert all(row["status"].startswith("skipped") for row in rows)
+
+    # explicitly given runs are kept and fail to register
+    rows = aml.register_models("model", "outputs/model", run_ids=["sweep"])
+    assert rows[0]["status"] == "failed, ValueError: No files to upload under outputs/model"
+
+
+def test_register_experiment_requires_metric_or_top(make_aml):
+    aml = make_aml(("run_1", {}))
+    with pytest.raises(ValueError):
+        aml.register_models("model", "outputs/model", experiment_name="sweep")
+
+
+def test_artifact_id():
+    run, other_run = FakeRun([], "run_1"), FakeRun([], "run_2")
+    assert artifact_id(run, "outputs/model") == artifact_id(run, "outputs/model/")
+    assert artifact_id(run, "outputs/model") != artifact_id(run, "logs")
+    # an identity of the run's artifact, not of its content
+    assert artifact_id(run, "outputs/model") != artifact_id(other_run, "outputs/model")
@@ -0,0 +1,127 @@
+import json
+import os
+
+import pytest
+import torch
+
+from happifyml.integrations.sharding import (
+    WEIGHTS_INDEX_NAME,
+    WEIGHTS_NAME,
+    init_empty_weights,
+    load_sharded,
+    save_sharded,
+)
+
+
+class TiedLM(torch.nn.Module):
+    """
+    Language model with input and output embeddings tied, like hf models with `tie_word_embeddings`.
+    """
+
+    def __init__(self, vocab_size=64, hidden_size=16):
+        super().__init__()
+        self.embeddings = torch.nn.Embedding(vocab_size, hidden_size)
+        self.dense = torch.nn.Linear(hidden_size, hidden_size)
+        self.empty = torch.nn.Parameter(torch.zeros(0))
+        self.empty2 = torch.nn.Parameter(torch.zeros(0, hidden_size))
+        self.lm_head = torch.nn.Linear(hidden_size, vocab_size, bias=False)
+        self.register_buffer("position_ids", torch.arange(8))
+        self.tie_weights()
+
+    def tie_weights(self):
+        self.lm_head.weight = self.embeddings.weight
+
+
+def assert_same_weights(model, other):
+    state_dict, other_state_dict = model.state_dict(), other.state_dict()
+    assert list(state_dict) == list(other_state_dict)
+    for name, tensor in state_dict.items():
+        assert torch.equal(tensor, other_state_dict[name]), name
+
+
+@pytest.mark.parametrize("max_shard_size", ["1MB", 2048])
+def test_sharded_round_trip(tmp_path, max_shard_size):
+    torch.manual_seed(0)
+    model = TiedLM()
+    files = save_sharded(model, str(tmp_path), max_shard_size=max_shard_size)
+
+    if max_shard_size == "1MB":
+        assert files == [WEIGHTS_NAME]
+    else:
+        assert len(files) > 1
+        with open(tmp_path / WEIGHTS_INDEX_NAME) as f:
+            weight_map = json.load(f)["weight_map"]
+        # tied weights are saved once, empty parameters are all saved
+        assert "embeddings.weight" in weight_map and "lm_head.weight" not in weight_map
+        assert {"empty", "empty2"} <= set(weight_map)
+        assert sorted(set(weight_map.values())) == sorted(files)
+
+    with init_empty_weights():
+        loaded = TiedLM()
+    assert loaded.dense.weight.is_meta and not loaded.position_ids.is_meta
+
+    load_sharded(loaded, str(tmp_path))
+    assert_same_weights(model, loaded)
+    assert loaded.lm_head.weight is loaded.embeddings.weight
+
+
+def test_load_sharded_casts_dtype(tmp_path):
+    model = TiedLM()
+    save_sharded(model, str(tmp_path))
+
+    with init_empty_weights():
+        loaded = TiedLM()
+    load_sharded(loaded, str(tmp_path), dtype=torch.float16)
+    assert loaded.dense.weight.dtype == torch.float16
+    assert loaded.position_ids.dtype == torch.int64
+
+
+def test_load_sharded_memory_budget(tmp_path):
+    save_sharded(TiedLM(), str(tmp_path))
+
+    with init_empty_weights():
+        loaded = TiedLM()
+    with pytest.raises(MemoryError, match="exceeds memory budget"):
+        load_sharded(loaded, str(tmp_path), max_memory="1KB")
+
+
+def test_load_sharded_missing_weights(tmp_path):
+    save_sharded(torch.nn.Linear(4, 4), str(tmp_path))
+
+    with init_empty_weights():
+        loaded = TiedLM()
+    with pytest.raises(ValueError, match="Weights missing"):
+        load_sharded(loaded, str(tmp_path))
+
+
+def test_save_sharded_leaves_model_untouched(tmp_path):
+    model = TiedLM()
+    before = {name: tensor.clone() for name, tensor in model.state_dict().items()}
+    save_sharded(model, str(tmp_path), max_shard_size=2048)
+
+    assert all(torch.equal(before[name], tensor) for name, tensor in model.state_dict().items())
+    assert not any(name.endswith(".tmp") for name in os.listdir(tmp_path))
+
+
+def test_from_pretrained_low_memory_kwargs(tmp_path):
+    transformers = pytest.importorskip("transformers")
+    from happifyml.integrations.azure import AzureMixin
+
+    class BertForSequenceClassification(AzureMixin, transformers.BertForSequenceClassification):
+        pass
+
+    config = transformers.BertConfig(
+        vocab_size=64, hidden_size=16, num_hidden_layers=1, num_attention_heads=2, intermediate_size=32
+    )
+    model = BertForSequenceClassification(config)
+    model.save_pretrained(str(tmp_path), low_memory=True, max_memory=4096)
+
+    loaded = BertForSequenceClassification.from_pretrained(
+        str(tmp_path), low_memory=True, torch_dtype=torch.float16, output_hidden_states=True
+    )
+    assert loaded.config.output_hidden_states
+    assert loaded.classifier.weight.dtype == torch.float16
+    assert torch.equal(loaded.classifier.weight, model.classifier.weight.half())
+
+    with pytest.raises(TypeError, match="device_map"):
+        BertForSequenceClassification.from_pretrained(str(tmp_path), low_memory=True, device_map="auto")
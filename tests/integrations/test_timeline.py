@@ -0,0 +1,150 @@
+import json
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from happifyml.integrations import timeline as timeline_module
+from happifyml.integrations.timeline import (
+    CLIENT_TID,
+    SERVICE_TID,
+    STATUS_PHASES,
+    STATUS_TID,
+    SUBMIT_PHASE,
+    Timeline,
+    export_chrome_trace,
+    parse_utc,
+    run_trace_events,
+)
+
+START = datetime(2021, 6, 2, 18, 20, 42, tzinfo=timezone.utc).timestamp()
+
+
+class FakeRun:
+    def __init__(self, statuses):
+        self.statuses = list(statuses)
+
+    def get_status(self):
+        status = self.statuses.pop(0) if len(self.statuses) > 1 else self.statuses[0]
+        if isinstance(status, Exception):
+            raise status
+        return status
+
+
+def spans(events, tid):
+    return [
+        (event["name"], event["ts"] / 1e6, event["dur"] / 1e6)
+        for event in events
+        if event.get("tid") == tid and event["ph"] == "X"
+    ]
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("2021-06-02T18:20:42Z", START),
+        ("2021-06-02T18:20:42.1234567Z", START + 0.123456),
+        ("2021-06-02T18:20:42.5+00:00", START + 0.5),
+        ("2021-06-02T18:20:42.12345Z", START + 0.12345),
+        ("2021-06-02T18:20:42", START),
+        ("2021-06-02T20:20:42+02:00", START),
+        (None, None),
+        ("", None),
+    ],
+)
+def test_parse_utc(value, expected):
+    assert parse_utc(value) == pytest.approx(expected)
+
+
+def test_watch_status_records_transitions():
+    run = FakeRun(["Queued", "Queued", ConnectionResetError(), "Running", "Running", "Completed"])
+    timeline = Timeline()
+
+    with timeline.watch_status(run, interval=0.01):
+        deadline = time.monotonic() + 5
+        while not timeline.statuses or timeline.statuses[-1]["status"] != "Completed":
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+
+    assert [status["status"] for status in timeline.statuses] == ["Queued", "Running", "Completed"]
+    times = [status["time"] for status in timeline.statuses]
+    assert times == sorted(times)
+
+
+def test_watch_status_stops_on_exit():
+    timeline = Timeline()
+    with timeline.watch_status(FakeRun(["Running"]), interval=0.01):
+        time.sleep(0.05)
+    assert [status["status"] for status in timeline.statuses] == ["Running"]
+
+
+def test_save_and_load(tmp_path, monkeypatch):
+    monkeypatch.setattr(timeline_module, "TIMELINE_DIR", str(tmp_path))
+    timeline = Timeline(statuses=[{"status": "Queued", "time": START}])
+    with timeline.phase(SUBMIT_PHASE):
+        pass
+
+    timeline.save("run-1")
+    loaded = Timeline.load("run-1")
+    assert loaded.phases == timeline.phases
+    assert loaded.statuses == timeline.statuses
+    assert Timeline.load("run-2") is None
+
+
+def test_run_trace_events():
+    timeline = Timeline(
+        phases=[{"name": SUBMIT_PHASE, "start": START - 10, "end": START - 5}],
+        statuses=[
+            {"status": "Queued", "time": START - 5},
+            {"status": "Running", "time": START},
+            {"status": "Completed", "time": START + 60},
+        ],
+    )
+    details = {
+        "status": "Completed",
+        "startTimeUtc": "2021-06-02T18:20:42Z",
+        "endTimeUtc": "2021-06-02T18:21:42Z",
+        "target": "gpu-cluster",
+    }
+
+    events = run_trace_events(3, "run-1", details, timeline)
+
+    assert {event["pid"] for event in events} == {3}
+    assert events[0]["args"]["name"] == "run-1 (Completed)"
+    assert spans(events, CLIENT_TID) == [(SUBMIT_PHASE, START - 10, 5)]
+    # terminal statuses end the previous span and get none of their own
+    assert spans(events, STATUS_TID) == pytest.approx(
+        [(STATUS_PHASES["Queued"], START - 5, 5), (STATUS_PHASES["Running"], START, 60)]
+    )
+    assert spans(events, SERVICE_TID) == pytest.approx(
+        [("Waiting (queue, image build, node preparation)", START - 5, 5), ("Run on compute", START, 60)]
+    )
+    assert events[-1]["args"] == {"target": "gpu-cluster"}
+
+
+def test_run_trace_events_without_timeline():
+    events = run_trace_events(1, "run-1", {"status": "Running", "startTimeUtc": "2021-06-02T18:20:42Z"})
+
+    assert spans(events, CLIENT_TID) == spans(events, STATUS_TID) == []
+    # still running: the span ends now
+    [(name, start, duration)] = spans(events, SERVICE_TID)
+    assert name == "Run on compute" and start == START
+    assert duration == pytest.approx(time.time() - START, abs=5)
+
+
+def test_export_chrome_trace(tmp_path):
+    runs = [
+        {"run_id": "run-1", "details": {"status": "Completed", "startTimeUtc": "2021-06-02T18:20:42Z"}},
+        {"run_id": "run-2", "details": {"status": "Queued"}, "timeline": Timeline()},
+    ]
+    path = str(tmp_path / "timeline.json")
+
+    export_chrome_trace(runs, path)
+
+    with open(path) as f:
+        trace = json.load(f)
+    processes = {
+        event["pid"]: event["args"]["name"] for event in trace["traceEvents"] if event["name"] == "process_name"
+    }
+    assert processes == {1: "run-1 (Completed)", 2: "run-2 (Queued)"}
+    assert {event["pid"] for event in trace["traceEvents"]} == {1, 2}
@@ -0,0 +1,27 @@
+import pytest
+import torch
+
+from happifyml.utils import PeakRSSMonitor, format_size, parse_size
+
+
+def test_parse_size():
+    assert parse_size(123) == 123
+    assert parse_size("2GB") == 2_000_000_000
+    assert parse_size("500MiB") == 500 * 2**20
+    assert parse_size(" 1.5 kb ") == 1500
+    with pytest.raises(ValueError):
+        parse_size("2 parsecs")
+
+
+def test_format_size():
+    assert format_size(999) == "999.0 B"
+    assert format_size(1_500_000) == "1.5 MB"
+
+
+def test_peak_rss_monitor():
+    with PeakRSSMonitor(interval=0.01) as monitor:
+        tensor = torch.ones(64 * 2**20 // 4)
+    del tensor
+
+    assert monitor.peak - monitor.start > 32 * 2**20
+    assert monitor.report("Allocated").startswith("Allocated: peak RSS")
@@ -0,0 +1,123 @@
+import threading
+import time
+
+import pytest
+
+from happifyml.utils import CallStats, CallTimeoutError, RemoteCall
+
+
+class HttpError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+class FaultyService:
+    """
+    Fake remote endpoint failing, or answering slowly, according to a script of faults, one per request.
+    """
+
+    def __init__(self, faults=(), delay=0.0):
+        self.faults = list(faults)
+        self.delay = delay
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, value="ok"):
+        with self._lock:
+            self.requests += 1
+            fault = self.faults.pop(0) if self.faults else None
+
+        if isinstance(fault, (int, float)) and not isinstance(fault, bool):
+            time.sleep(fault)
+        elif fault is not None:
+            raise fault
+        time.sleep(self.delay)
+        return value
+
+
+def make_call(stats, **kwargs):
+    return RemoteCall("op", stats=stats, sleep=lambda seconds: None, **kwargs)
+
+
+def test_retries_transient_errors():
+    stats = CallStats()
+    service = FaultyService([HttpError(503), ConnectionError("reset")])
+
+    assert make_call(stats)(service, "run") == "run"
+    assert service.requests == 3
+    assert stats.summary()["op"]["retries"] == 2
+
+
+def test_gives_up_after_retries():
+    stats = CallStats()
+    service = FaultyService([HttpError(500)] * 5)
+
+    with pytest.raises(HttpError):
+        make_call(stats, retries=2)(service)
+    assert service.requests == 3
+    assert stats.summary()["op"]["failures"] == 1
+
+
+def test_client_errors_are_not_retried():
+    service = FaultyService([HttpError(404)])
+
+    with pytest.raises(HttpError):
+        make_call(CallStats())(service)
+    assert service.requests == 1
+
+
+def test_non_idempotent_only_retries_rejected_requests():
+    service = FaultyService([HttpError(429), HttpError(500)])
+    call = make_call(CallStats(), idempotent=False)
+
+    with pytest.raises(HttpError) as e:
+        call(service)
+    assert e.value.status_code == 500
+    assert service.requests == 2
+
+
+def test_timeout():
+    stats = CallStats()
+    service = FaultyService([0.5, 0.5])
+
+    with pytest.raises(CallTimeoutError):
+        make_call(stats, timeout=0.05, retries=1)(service)
+    assert stats.summary()["op"]["timeouts"] == 2
+
+
+def test_timed_out_non_idempotent_call_is_not_retried():
+    service = FaultyService([0.5])
+
+    with pytest.raises(CallTimeoutError):
+        make_call(CallStats(), timeout=0.05, idempotent=False)(service)
+    assert service.requests == 1
+
+
+def test_hedged_request_wins_over_slow_one():
+    stats = CallStats()
+    service = FaultyService([1.0])
+
+    start = time.perf_counter()
+    assert make_call(stats, hedge_after=0.05, timeout=5)(service) == "ok"
+
+    assert time.perf_counter() - start < 0.5
+    assert service.requests == 2
+    assert stats.summary()["op"]["hedges"] == 1
+    assert stats.summary()["op"]["hedge_wins"] == 1
+
+
+def test_hedging_requires_idempotent():
+    with pytest.raises(ValueError):
+        RemoteCall("op", hedge_after=1, idempotent=False)
+
+
+def test_latency_percentiles():
+    stats = CallStats()
+    call = make_call(stats)
+    for _ in range(10):
+        call(FaultyService())
+
+    summary = stats.summary()["op"]
+    assert summary["calls"] == 10
+    assert summary["p50_ms"] <= summary["p99_ms"]